@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from . import db, signals  # noqa: F401
+        from .catalog import bump_version
+        from .fts import ensure_triggers
+
+        # Migrations edit the catalog through historical models, which send no signals.
+        post_migrate.connect(bump_version, sender=self)
+        post_migrate.connect(ensure_triggers, sender=self)
@@ -0,0 +1,184 @@
+"""
+Native async versions of the views in ``views.py``, for serving under ASGI.
+
+They read through Django's async ORM, so an ASGI server keeps slow clients in
+flight without holding a thread per request. Cached payloads are served
+without any ORM work, exactly as in the sync views. Enabled by
+``API_ASYNC_VIEWS``, which ``config/asgi.py`` turns on.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+
+from . import fts
+from .compact import COMPACT_FORMAT, aserialize_compact
+from .catalog import apayload_response, conditional
+from .filters import (
+    filter_simulations,
+    filter_values,
+    has_filters,
+    page_data,
+    page_queryset,
+)
+from .params import (
+    fields_param,
+    format_param,
+    include_param,
+    int_param,
+    listing_params,
+    payload_key,
+    search_params,
+)
+from .renderers import CONTENT_TYPE, NDJSON_CONTENT_TYPE, FastJsonResponse, dumps_chunk
+from .search import aget_index, ranks_by_text
+from .serializers import (
+    aiter_simulations,
+    aserialize_all,
+    aserialize_role_tags,
+    aserialize_simulation_topics,
+    aserialize_simulations,
+    aserialize_week_topics,
+    serialize_changes,
+    simulation_rows,
+)
+# The snapshot views only read small local files; they run as sync views.
+from .views import (  # noqa: F401
+    STREAM_CHUNK_SIZE,
+    bad_request,
+    catalog_manifest,
+    catalog_snapshot,
+    not_found,
+)
+
+
+@conditional
+async def list_simulations(request):
+    try:
+        stream, page = listing_params(request.GET)
+        fields = fields_param(request.GET)
+    except ValueError as e:
+        return bad_request(e)
+
+    if stream is None and page is None and not has_filters(request.GET):
+        return await apayload_response(
+            request,
+            payload_key("simulations", fields=fields),
+            lambda: aserialize_simulations(simulation_rows(fields)),
+        )
+
+    simulations = filter_simulations(simulation_rows(fields), request.GET)
+    if stream is not None:
+        return _stream_simulations(simulations, stream)
+    if page is None:
+        return FastJsonResponse(await aserialize_simulations(simulations))
+
+    limit, cursor = page
+    rows = await aserialize_simulations(page_queryset(simulations, limit, cursor))
+    return FastJsonResponse(page_data(rows, limit))
+
+
+def _stream_simulations(simulations, stream):
+    chunks = aiter_simulations(simulations, STREAM_CHUNK_SIZE)
+    if stream == "ndjson":
+        return StreamingHttpResponse(
+            _ndjson_lines(chunks), content_type=NDJSON_CONTENT_TYPE
+        )
+    return StreamingHttpResponse(_json_array(chunks), content_type=CONTENT_TYPE)
+
+
+async def _ndjson_lines(chunks):
+    async for chunk in chunks:
+        yield dumps_chunk(chunk, ndjson=True)
+
+
+async def _json_array(chunks):
+    yield b"["
+    separator = b""
+    async for chunk in chunks:
+        yield separator + dumps_chunk(chunk)
+        separator = b","
+    yield b"]"
+
+
+@conditional
+async def get_simulation(request, sim_id):
+    try:
+        fields = fields_param(request.GET)
+    except ValueError as e:
+        return bad_request(e)
+
+    simulation = await simulation_rows(fields).filter(id=sim_id).afirst()
+    if simulation is None:
+        return not_found("No such simulation.")
+    return FastJsonResponse(simulation)
+
+
+@conditional
+async def list_simulation_topics(request):
+    return await apayload_response(
+        request, "simulation_topics", aserialize_simulation_topics
+    )
+
+
+@conditional
+async def list_role_tags(request):
+    return await apayload_response(request, "role_tags", aserialize_role_tags)
+
+
+@conditional
+async def list_week_topics(request):
+    return await apayload_response(request, "week_topics", aserialize_week_topics)
+
+
+@conditional
+async def list_all(request):
+    try:
+        include = include_param(request.GET)
+        fields = fields_param(request.GET)
+        since = int_param(request.GET, "since", None)
+        catalog_format = format_param(request.GET)
+    except ValueError as e:
+        return bad_request(e)
+    if since is not None and catalog_format is not None:
+        return bad_request("since does not support format")
+
+    if since is not None:
+        changes = await sync_to_async(serialize_changes)(since, include, fields)
+        return FastJsonResponse(changes)
+
+    abuild = aserialize_compact if catalog_format == COMPACT_FORMAT else aserialize_all
+    return await apayload_response(
+        request,
+        payload_key("all", include=include, fields=fields, format=catalog_format),
+        lambda: abuild(include, fields),
+    )
+
+
+@conditional
+async def search_simulations(request):
+    try:
+        text, params = search_params(request.GET)
+    except ValueError as e:
+        return bad_request(e)
+
+    index = await aget_index()
+    matches = page = None
+    if text and ranks_by_text(**params):
+        page = await sync_to_async(fts.match_page)(text, params["limit"], params["offset"])
+    if page is None:
+        matches = await sync_to_async(fts.match_ids)(text) if text else None
+        total, results = index.search(matches=matches, **params)
+    else:
+        total, ids = page
+        results = index.page(ids)
+    if page is not None or matches is not None:
+        results = fts.highlight_results(text, results)
+    return FastJsonResponse({"count": total, "results": results})
+
+
+@conditional
+async def facet_counts(request):
+    text = request.GET.get("q", "").strip()
+    matches = await sync_to_async(fts.match_ids)(text) if text else None
+    counts = (await aget_index()).facet_counts(filter_values(request.GET), matches)
+    return FastJsonResponse(counts)
@@ -0,0 +1,293 @@
+"""
+Process-level cache of serialized catalog payloads.
+
+The catalog changes only through the admin or an import, so every payload is
+encoded once and kept in memory under the catalog version that produced it.
+The version itself lives in the ``catalog`` cache, which is shared between
+worker processes, and is bumped whenever a catalog model changes (see
+``signals.py``). A catalog view reads it once per request (see
+``conditional``), so a repeat request costs one version read and one
+dictionary lookup, with no ORM work and no JSON encoding.
+
+Payloads are also compressed, at most once per version and encoding, and
+served according to the request's ``Accept-Encoding``.
+
+Payloads of older versions are dropped as soon as one of a newer version is
+stored. Clients choose the fields, resources and format of a payload, so the
+cache is also bounded: beyond ``API_PAYLOAD_CACHE_BYTES`` the least recently
+used payloads are dropped.
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+
+from . import timing
+from .renderers import CONTENT_TYPE, dumps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CACHE_ALIAS = "catalog"
+VERSION_KEY = "catalog:version"
+
+# Smaller payloads are not worth compressing.
+MIN_COMPRESS_SIZE = 200
+COMPRESSORS = {"gzip": lambda content: gzip.compress(content, compresslevel=9, mtime=0)}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda content: brotli.compress(content, quality=9)
+# In order of preference.
+ENCODINGS = ("br", "gzip")
+
+# key -> (version, {encoding or None: content}), least recently used first.
+_payloads = OrderedDict()
+_payloads_lock = threading.Lock()
+_pending_bump = threading.local()
+# The version read at the start of the current catalog request.
+_request_version = ContextVar("catalog_request_version", default=None)
+
+
+def get_version():
+    """
+    Return the current catalog version, initializing it if unset.
+
+    Within a catalog view, this is the version read when the request started.
+    """
+    version = _request_version.get()
+    if version is not None:
+        return version
+    return _read_version()
+
+
+def _read_version():
+    cache = caches[CACHE_ALIAS]
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version(**kwargs):
+    """Start a new catalog version, making every cached payload stale."""
+    caches[CACHE_ALIAS].set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_version_on_commit():
+    """
+    Bump the version once the current transaction commits (or now, outside one).
+
+    However many changes a transaction makes, e.g. a bulk delete sending one
+    signal per row, the version is bumped once. If the transaction rolls back,
+    its callbacks are dropped and the pending flag only causes one extra bump.
+    """
+    _pending_bump.value = True
+    transaction.on_commit(_bump_if_pending)
+
+
+def _bump_if_pending():
+    if getattr(_pending_bump, "value", False):
+        _pending_bump.value = False
+        bump_version()
+
+
+def _etag(request):
+    query = sorted((key, value) for key in request.GET for value in request.GET.getlist(key))
+    digest = hashlib.blake2b(
+        f"{request.path}?{query}".encode(), digest_size=8
+    ).hexdigest()
+    return f"{get_version()}-{digest}"
+
+
+def etag(request, *args, **kwargs):
+    """
+    Strong ETag for a catalog response.
+
+    Combines the catalog version with a digest of the path and the sorted query
+    string, since the same version serves different bodies per URL. A response
+    served compressed is a different body, so ``payload_response`` adds its
+    content encoding to its ETag; such an ETag is accepted back from clients
+    that still negotiate that encoding.
+    """
+    tag = _etag(request)
+    encoding = negotiate_encoding(request)
+    if encoding:
+        encoded = f"{tag}-{encoding}"
+        if quote_etag(encoded) in parse_etags(request.headers.get("If-None-Match", "")):
+            return encoded
+    return tag
+
+
+def last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(get_version() / 1e9, tz=timezone.utc)
+
+
+def conditional(view):
+    """
+    Serve ``view`` with catalog validators.
+
+    Requests whose ``If-None-Match``/``If-Modified-Since`` still match get a 304
+    before the view runs, so they never touch the ORM. ``no-cache`` makes
+    browsers revalidate on every visit instead of guessing a freshness lifetime.
+
+    The catalog version is read once, as the request starts, and used by the
+    validators and the view alike, so the ETag always matches the body.
+    """
+    view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+    view = vary_on_headers("Accept-Encoding")(view)
+    view = cache_control(no_cache=True)(view)
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def versioned(request, *args, **kwargs):
+            token = _request_version.set(_read_version())
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _request_version.reset(token)
+
+    else:
+
+        @wraps(view)
+        def versioned(request, *args, **kwargs):
+            token = _request_version.set(_read_version())
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _request_version.reset(token)
+
+    return versioned
+
+
+def negotiate_encoding(request):
+    """Pick the preferred compression accepted by the client, or None for identity."""
+    accepted = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        try:
+            q = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            q = 0.0
+        accepted[coding.strip().lower()] = q
+    for encoding in ENCODINGS:
+        if encoding in COMPRESSORS and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def _cached(key, version):
+    with _payloads_lock:
+        entry = _payloads.get(key)
+        if entry is not None and entry[0] == version:
+            _payloads.move_to_end(key)
+            return entry[1]
+    return None
+
+
+def _size(variants):
+    return sum(len(content) for content in variants.values())
+
+
+def _evict(keep):
+    """Drop the least recently used payloads over budget, except ``keep``'s."""
+    total = sum(_size(variants) for _, variants in _payloads.values())
+    for key in list(_payloads):
+        if total <= settings.API_PAYLOAD_CACHE_BYTES:
+            break
+        if key != keep:
+            total -= _size(_payloads.pop(key)[1])
+
+
+def _store(key, version, data):
+    with timing.timed("encode"):
+        variants = {None: dumps(data)}
+    with _payloads_lock:
+        for stale in [k for k, (v, _) in _payloads.items() if v < version]:
+            del _payloads[stale]
+        _payloads[key] = (version, variants)
+        _evict(key)
+    return variants
+
+
+def _variant(key, variants, encoding):
+    if encoding is None or len(variants[None]) < MIN_COMPRESS_SIZE:
+        return variants[None], None
+    if encoding not in variants:
+        with timing.timed("compress", encoding):
+            content = COMPRESSORS[encoding](variants[None])
+        with _payloads_lock:
+            variants.setdefault(encoding, content)
+            if key in _payloads:
+                _evict(key)
+    return variants[encoding], encoding
+
+
+def get_payload(key, build, encoding=None):
+    """
+    Return the payload cached under ``key`` for the current version.
+
+    ``build`` is called to produce the data on a miss. The version is read
+    before building, so a change committed mid-build only causes a rebuild on
+    the next request, never a stale entry under the new version.
+
+    Returns ``(content, encoding)``: the payload compressed with ``encoding``,
+    or the plain payload and None when it is too small to be worth it.
+    """
+    version = get_version()
+    variants = _cached(key, version)
+    timing.note("cache", desc="miss" if variants is None else "hit")
+    if variants is None:
+        with timing.timed("serialize"):
+            data = build()
+        variants = _store(key, version, data)
+    return _variant(key, variants, encoding)
+
+
+async def aget_payload(key, abuild, encoding=None):
+    """Like ``get_payload``, awaiting the coroutine function ``abuild`` on a miss."""
+    version = get_version()
+    variants = _cached(key, version)
+    timing.note("cache", desc="miss" if variants is None else "hit")
+    if variants is None:
+        with timing.timed("serialize"):
+            data = await abuild()
+        variants = _store(key, version, data)
+    if encoding in variants:
+        return _variant(key, variants, encoding)
+    # Compressing a large payload would stall the event loop.
+    return await sync_to_async(_variant, thread_sensitive=False)(key, variants, encoding)
+
+
+def _response(request, content, encoding):
+    response = HttpResponse(content, content_type=CONTENT_TYPE)
+    if encoding:
+        response["Content-Encoding"] = encoding
+        response["ETag"] = quote_etag(f"{_etag(request)}-{encoding}")
+    return response
+
+
+def payload_response(request, key, build):
+    """Serve the cached payload for ``key`` in the best encoding the client accepts."""
+    return _response(request, *get_payload(key, build, negotiate_encoding(request)))
+
+
+async def apayload_response(request, key, abuild):
+    return _response(request, *await aget_payload(key, abuild, negotiate_encoding(request)))
@@ -0,0 +1,82 @@
+"""
+Change log of the catalog, for delta sync.
+
+Every change to a simulation row (see ``readmodel.py``) or to a tag table is
+recorded as a ``CatalogChange``, whose id serves as the catalog version clients
+hold: ``/api/all`` returns it as ``version`` and ``/api/all?since=<version>``
+returns only what changed after it. Which simulations were upserted and which
+were deleted is read from the current rows, so the log only records ids.
+
+A change of resource ``ALL`` stands for a change to everything, such as the
+data present before the log existed; a delta across it, or across changes
+already removed by ``compact``, is answered with the full catalog instead.
+"""
+
+from django.db.models import Max, Min
+
+from .models import CatalogChange, RoleTag, SimulationTopic, SimulationTopicType, WeekTopic
+
+ALL = "all"
+SIMULATIONS = "simulations"
+TAG_RESOURCES = {
+    SimulationTopic: "simulation_topics",
+    SimulationTopicType: "simulation_topics",
+    RoleTag: "role_tags",
+    WeekTopic: "week_topics",
+}
+
+
+def record(resource, ids=None):
+    """Record a change to ``resource``, or to the simulations ``ids``."""
+    if ids is None:
+        CatalogChange.objects.create(resource=resource)
+    else:
+        CatalogChange.objects.bulk_create(
+            CatalogChange(resource=resource, object_id=i) for i in ids
+        )
+
+
+def record_tags(model):
+    """Record a change to the tag table of ``model``."""
+    record(TAG_RESOURCES[model])
+
+
+def latest_change():
+    """The id of the latest change, i.e. the current catalog version."""
+    return CatalogChange.objects.aggregate(version=Max("id"))["version"] or 0
+
+
+async def alatest_change():
+    return (await CatalogChange.objects.aaggregate(version=Max("id")))["version"] or 0
+
+
+def compact(before):
+    """Forget the changes made before ``before``, always keeping the latest one."""
+    return CatalogChange.objects.filter(
+        created_at__lt=before, id__lt=latest_change()
+    ).delete()[0]
+
+
+def changes_since(since):
+    """
+    What changed after version ``since``, or None if the log cannot tell.
+
+    Returns ``(version, simulation_ids, resources)``: the current version, the
+    ids of the simulations changed (upserted or deleted) since, and the names
+    of the other resources changed since.
+    """
+    bounds = CatalogChange.objects.aggregate(first=Min("id"), version=Max("id"))
+    if bounds["first"] is None or not bounds["first"] - 1 <= since <= bounds["version"]:
+        return None
+
+    simulation_ids = set()
+    resources = set()
+    changes = CatalogChange.objects.filter(id__gt=since).values_list("resource", "object_id")
+    for resource, object_id in changes.iterator():
+        if resource == ALL:
+            return None
+        if resource == SIMULATIONS:
+            simulation_ids.add(object_id)
+        else:
+            resources.add(resource)
+    return bounds["version"], simulation_ids, resources
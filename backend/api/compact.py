@@ -0,0 +1,111 @@
+"""
+Dictionary-encoded form of the combined catalog, served by ``/api/all?format=compact``.
+
+Every simulation repeats the names of its week topic, role, type, difficulty
+and topics, which the catalog already lists once. In the compact form each
+simulation is an array of its ``fields`` values, and those names are replaced
+by their index in the catalog lists:
+
+    week_topic          index into ``week_topics``
+    role                index into ``role_tags``, or null
+    simulation_topics   indexes into the topics of ``simulation_topics``,
+                        numbered in order across all topic types
+    type, difficulty    indexes into ``types`` and ``difficulties``
+
+The tag lists are always included, as they are the dictionaries. The decoder
+is ``frontend/src/utils/compactCatalog.js``.
+"""
+
+from .models import SimulationDifficulty, SimulationType
+from .serializers import (
+    CATALOG_RESOURCES,
+    UNCATEGORIZED_TOPIC_COLOR,
+    UNCATEGORIZED_TOPIC_TYPE,
+    aserialize_all,
+    serialize_all,
+)
+
+COMPACT_FORMAT = "compact"
+DICTIONARY_RESOURCES = ("simulation_topics", "role_tags", "week_topics")
+
+
+def _with_dictionaries(include):
+    return tuple(
+        name for name in CATALOG_RESOURCES if name in include or name in DICTIONARY_RESOURCES
+    )
+
+
+def serialize_compact(include, fields):
+    """The compact catalog of the ``include``d resources and simulation ``fields``."""
+    return compact_catalog(serialize_all(_with_dictionaries(include), fields), fields)
+
+
+async def aserialize_compact(include, fields):
+    catalog = await aserialize_all(_with_dictionaries(include), fields)
+    return compact_catalog(catalog, fields)
+
+
+class Dictionary:
+    """Indexes of the names of a list, appending the names it lacks."""
+
+    def __init__(self, names):
+        self.names = names
+        self.indexes = {name: i for i, name in enumerate(names)}
+
+    def index(self, name):
+        if name not in self.indexes:
+            self.indexes[name] = len(self.names)
+            self.names.append(name)
+        return self.indexes[name]
+
+
+def compact_catalog(catalog, fields):
+    """
+    Encode ``catalog``, as built by ``serializers.serialize_all``, compactly.
+
+    ``fields`` are the simulation fields of the catalog, in order.
+    """
+    week_topics = Dictionary(catalog["week_topics"])
+    role_tags = Dictionary(catalog["role_tags"])
+    types = Dictionary(list(SimulationType.values))
+    difficulties = Dictionary(list(SimulationDifficulty.values))
+    topics = Dictionary(
+        [name for group in catalog["simulation_topics"] for name in group["topics"]]
+    )
+    encoders = {
+        "week_topic": week_topics.index,
+        "role": lambda name: None if name is None else role_tags.index(name),
+        "type": types.index,
+        "difficulty": difficulties.index,
+        "simulation_topics": lambda names: [topics.index(name) for name in names],
+    }
+
+    compact = {"format": COMPACT_FORMAT, "version": catalog["version"]}
+    if "simulations" in catalog:
+        compact["fields"] = list(fields)
+        compact["simulations"] = [
+            [encoders[f](sim[f]) if f in encoders else sim[f] for f in fields]
+            for sim in catalog["simulations"]
+        ]
+    compact["simulation_topics"] = _topic_tree(catalog["simulation_topics"], topics)
+    compact["role_tags"] = role_tags.names
+    compact["week_topics"] = week_topics.names
+    compact["types"] = types.names
+    compact["difficulties"] = difficulties.names
+    return compact
+
+
+def _topic_tree(tree, topics):
+    """The topic tree, with any topic appended while encoding filed as uncategorized."""
+    listed = sum(len(group["topics"]) for group in tree)
+    if len(topics.names) == listed:
+        return tree
+    extra = topics.names[listed:]
+    if tree and tree[-1]["topicType"] == UNCATEGORIZED_TOPIC_TYPE:
+        return tree[:-1] + [{**tree[-1], "topics": tree[-1]["topics"] + extra}]
+    uncategorized = {
+        "topicType": UNCATEGORIZED_TOPIC_TYPE,
+        "topics": extra,
+        "color": UNCATEGORIZED_TOPIC_COLOR,
+    }
+    return tree + [uncategorized]
@@ -0,0 +1,52 @@
+"""Query-string filters shared by the simulation endpoints."""
+
+from .models import Simulation
+
+FILTER_PARAMS = ("type", "difficulty", "week_topic", "role", "simulation_topics")
+
+
+def has_filters(params):
+    return any(name in params for name in FILTER_PARAMS)
+
+
+def filter_values(params):
+    """The selected values of every filter parameter."""
+    return {name: params.getlist(name) for name in FILTER_PARAMS}
+
+
+def filter_simulations(queryset, params):
+    """
+    Narrow ``queryset`` of read model rows by the filters in ``params`` (a
+    ``QueryDict``).
+
+    Each parameter may be repeated: values of one parameter are OR-ed, different
+    parameters are AND-ed. Every filter but the topics hits a column index of
+    the row table; topics go through the simulations' through table.
+    """
+    if types := params.getlist("type"):
+        queryset = queryset.filter(type__in=types)
+    if difficulties := params.getlist("difficulty"):
+        queryset = queryset.filter(difficulty__in=difficulties)
+    if week_topics := params.getlist("week_topic"):
+        queryset = queryset.filter(week_topic__in=week_topics)
+    if roles := params.getlist("role"):
+        queryset = queryset.filter(role__in=roles)
+    if topics := params.getlist("simulation_topics"):
+        Through = Simulation.simulation_topics.through
+        queryset = queryset.filter(
+            id__in=Through.objects.filter(simulationtopic__name__in=topics).values(
+                "simulation_id"
+            )
+        )
+    return queryset
+
+
+def page_queryset(queryset, limit, cursor):
+    """The keyset page after ``cursor``, with one extra row to tell if more follow."""
+    return queryset.filter(id__gt=cursor).order_by("id")[: limit + 1]
+
+
+def page_data(rows, limit):
+    """Wrap the serialized rows of ``page_queryset`` with the cursor of the next page."""
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return {"results": rows[:limit], "next_cursor": next_cursor}
@@ -0,0 +1,222 @@
+"""
+Full-text search over simulation titles, summaries and authors.
+
+Backed by the SQLite FTS5 table ``api_simulation_fts``, which mirrors the
+precomputed ``title_terms`` and ``search_terms`` columns of ``api_simulation``
+(see ``hebrew.py`` for how they are normalized) and is ranked with bm25. On
+other databases matching falls back to a ``LIKE`` scan ordered by id.
+
+The ids matching a query are cached per catalog version, so the search and
+facet requests of one query, and each of its pages, scan the index once.
+"""
+
+import threading
+from array import array
+from collections import OrderedDict
+
+from django.db import connection
+from django.db.models import Q
+
+from . import hebrew
+from .catalog import get_version
+from .models import Simulation
+
+FTS_TABLE = "api_simulation_fts"
+# bm25 weights of the title_terms and search_terms columns.
+BM25_WEIGHTS = (10.0, 1.0)
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_WORDS = 16
+# Queries whose matching ids are kept, most recently used first.
+MATCH_CACHE_SIZE = 32
+
+# Recreated after migrations: SQLite drops a table's triggers when Django
+# rebuilds the table to alter it.
+TRIGGERS = {
+    "api_simulation_fts_insert": """
+        CREATE TRIGGER api_simulation_fts_insert AFTER INSERT ON api_simulation BEGIN
+            INSERT INTO api_simulation_fts(rowid, title_terms, search_terms)
+            VALUES (new.id, new.title_terms, new.search_terms);
+        END
+    """,
+    "api_simulation_fts_delete": """
+        CREATE TRIGGER api_simulation_fts_delete AFTER DELETE ON api_simulation BEGIN
+            INSERT INTO api_simulation_fts(api_simulation_fts, rowid, title_terms, search_terms)
+            VALUES ('delete', old.id, old.title_terms, old.search_terms);
+        END
+    """,
+    "api_simulation_fts_update": """
+        CREATE TRIGGER api_simulation_fts_update AFTER UPDATE ON api_simulation BEGIN
+            INSERT INTO api_simulation_fts(api_simulation_fts, rowid, title_terms, search_terms)
+            VALUES ('delete', old.id, old.title_terms, old.search_terms);
+            INSERT INTO api_simulation_fts(rowid, title_terms, search_terms)
+            VALUES (new.id, new.title_terms, new.search_terms);
+        END
+    """,
+}
+
+
+def available():
+    return connection.vendor == "sqlite"
+
+
+def index_simulation(sim):
+    """Precompute the search terms of ``sim``; called before every save."""
+    sim.title_terms = hebrew.index_terms(sim.title)
+    sim.search_terms = hebrew.index_terms(sim.summary, sim.author)
+
+
+def ensure_triggers(using="default", **kwargs):
+    """Restore missing sync triggers and rebuild the index if any were missing."""
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') "
+            "AND name LIKE %s",
+            [f"{FTS_TABLE}%"],
+        )
+        existing = {name for (name,) in cursor.fetchall()}
+        if FTS_TABLE not in existing:
+            return
+        missing = [sql for name, sql in TRIGGERS.items() if name not in existing]
+        for sql in missing:
+            cursor.execute(sql)
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def delete_all(cursor):
+    """
+    Delete every simulation and empty the index, within the current transaction.
+
+    The delete trigger would remove the simulations from the index one at a
+    time, re-tokenizing each; it is dropped for the delete and restored.
+    """
+    if not available():
+        cursor.execute("DELETE FROM api_simulation")
+        return
+    cursor.execute("DROP TRIGGER IF EXISTS api_simulation_fts_delete")
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+    cursor.execute("DELETE FROM api_simulation")
+    cursor.execute(TRIGGERS["api_simulation_fts_delete"])
+
+
+def _quote(term):
+    return '"{}"'.format(term.replace('"', '""'))
+
+
+def fts_query(terms):
+    """
+    Build an FTS5 query from ``hebrew.query_terms`` output.
+
+    Every word must match through one of its forms; the forms of the last word
+    also match as prefixes, for search-as-you-type. Terms are quoted, so FTS5 syntax in the
+    input is matched literally.
+    """
+    groups = []
+    for i, forms in enumerate(terms):
+        suffix = "*" if i == len(terms) - 1 else ""
+        alternatives = [_quote(form) + suffix for form in forms]
+        groups.append("(" + " OR ".join(alternatives) + ")")
+    return " AND ".join(groups)
+
+
+_match_cache = OrderedDict()
+_match_cache_lock = threading.Lock()
+
+
+def _fallback_matches(terms):
+    matches = Simulation.objects.all()
+    for forms in terms:
+        condition = Q()
+        for form in forms:
+            condition |= Q(title_terms__icontains=form) | Q(search_terms__icontains=form)
+        matches = matches.filter(condition)
+    return matches.order_by("id")
+
+
+def _select_ids(query):
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, {weights})",
+            [query],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _cache_key(terms):
+    return get_version(), fts_query(terms)
+
+
+def _cached(key):
+    with _match_cache_lock:
+        ids = _match_cache.get(key)
+        if ids is not None:
+            _match_cache.move_to_end(key)
+        return ids
+
+
+def match_ids(text):
+    """Ids of the simulations matching ``text``, best first; None if it has no words."""
+    terms = hebrew.query_terms(text)
+    if not terms:
+        return None
+    key = _cache_key(terms)
+    ids = _cached(key)
+    if ids is not None:
+        return ids
+    if available():
+        ids = array("q", _select_ids(key[1]))
+    else:
+        ids = array("q", _fallback_matches(terms).values_list("id", flat=True))
+    with _match_cache_lock:
+        for stale in [k for k in _match_cache if k[0] != key[0]]:
+            del _match_cache[stale]
+        _match_cache[key] = ids
+        while len(_match_cache) > MATCH_CACHE_SIZE:
+            _match_cache.popitem(last=False)
+    return ids
+
+
+def match_page(text, limit, offset=0):
+    """
+    ``(total, ids)`` of a page of the simulations matching ``text``, best first.
+
+    Pages are sliced from the cached ``match_ids``. Returns None if ``text``
+    has no words.
+    """
+    ids = match_ids(text)
+    if ids is None:
+        return None
+    return len(ids), list(ids[offset : offset + limit])
+
+
+def highlight_results(text, results):
+    """Add a ``highlight`` with the title's matches marked and a summary snippet."""
+    terms = {form for forms in hebrew.query_terms(text) for form in forms}
+    return [
+        {
+            **sim,
+            "highlight": {
+                "title": hebrew.highlight(
+                    sim["title"], terms, HIGHLIGHT_START, HIGHLIGHT_END
+                ),
+                "summary": hebrew.snippet(
+                    sim["summary"],
+                    terms,
+                    HIGHLIGHT_START,
+                    HIGHLIGHT_END,
+                    SNIPPET_ELLIPSIS,
+                    SNIPPET_WORDS,
+                ),
+            },
+        }
+        for sim in results
+    ]
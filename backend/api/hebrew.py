@@ -0,0 +1,114 @@
+"""
+Hebrew-aware text normalization and tokenization for search.
+
+The same rules apply at index time and at query time:
+
+- niqqud and cantillation marks are removed;
+- geresh and gershayim inside a word are dropped, so ``ב"מ``, ``ב״מ`` and
+  ``במ`` are one word;
+- final letter forms are mapped to their regular forms (ם → מ, ...);
+- Latin text is case-folded.
+
+Words written with attached prefix letters (ו/ה/ב/ל/מ/ש/כ, e.g. ``והמפקד``)
+are indexed along with their stripped forms (``המפקד``, ``מפקד``), so a query
+for the bare word finds them. The index-time output is precomputed and stored
+per simulation (see ``fts.index_simulation``).
+"""
+
+import html
+import re
+import unicodedata
+
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+PREFIX_LETTERS = frozenset("והבלמשכ")
+MAX_PREFIX_LENGTH = 3
+# Shortest word left after stripping prefixes, at index and at query time.
+MIN_STEM_LENGTH = 2
+MIN_QUERY_STEM_LENGTH = 3
+
+_MARKS = "\u0591-\u05bd\u05bf\u05c1\u05c2\u05c4\u05c5\u05c7"
+_QUOTES = "\"'\u05f3\u05f4\u2018\u2019\u201c\u201d"
+# A word may carry marks and contain quote characters between its letters.
+WORD = re.compile(rf"[\w{_MARKS}]+(?:[{_QUOTES}][\w{_MARKS}]+)*")
+_DROP = re.compile(rf"[{_QUOTES}_]")
+
+
+def normalize_word(word):
+    """Normalize a single word as matched by ``WORD``."""
+    word = unicodedata.normalize("NFKD", word)
+    word = "".join(ch for ch in word if not unicodedata.combining(ch))
+    return _DROP.sub("", word).translate(FINAL_LETTERS).casefold()
+
+
+def tokenize(text):
+    """Split ``text`` into normalized words."""
+    words = (normalize_word(match.group()) for match in WORD.finditer(text))
+    return [word for word in words if word]
+
+
+def prefix_variants(word, min_length=MIN_STEM_LENGTH):
+    """The forms of ``word`` with up to ``MAX_PREFIX_LENGTH`` prefix letters removed."""
+    variants = []
+    for i in range(1, MAX_PREFIX_LENGTH + 1):
+        if len(word) - i < min_length or word[i - 1] not in PREFIX_LETTERS:
+            break
+        variants.append(word[i:])
+    return variants
+
+
+def index_terms(*texts):
+    """Space-separated distinct terms of ``texts``, with prefix variants, for indexing."""
+    terms = {}
+    for text in texts:
+        for word in tokenize(text):
+            terms[word] = None
+            for variant in prefix_variants(word):
+                terms[variant] = None
+    return " ".join(terms)
+
+
+def query_terms(text):
+    """For each word of a query, its normalized form followed by its prefix variants."""
+    return [
+        [word, *prefix_variants(word, MIN_QUERY_STEM_LENGTH)] for word in tokenize(text)
+    ]
+
+
+def _matches(word, terms):
+    word = normalize_word(word)
+    return word in terms or any(v in terms for v in prefix_variants(word))
+
+
+def highlight(text, terms, start, end):
+    """
+    Wrap the words of ``text`` that match any of ``terms`` with ``start``/``end``.
+
+    The markers are HTML, so the text around them is HTML-escaped.
+    """
+    parts = []
+    position = 0
+    for match in WORD.finditer(text):
+        parts.append(html.escape(text[position : match.start()]))
+        word = html.escape(match.group())
+        parts.append(f"{start}{word}{end}" if _matches(match.group(), terms) else word)
+        position = match.end()
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
+
+
+def snippet(text, terms, start, end, ellipsis, size):
+    """
+    A window of about ``size`` words of ``text`` around its first match, highlighted.
+
+    Falls back to the beginning of the text when nothing matches.
+    """
+    words = list(WORD.finditer(text))
+    if len(words) <= size:
+        return highlight(text, terms, start, end)
+    first = next((i for i, m in enumerate(words) if _matches(m.group(), terms)), 0)
+    lo = max(0, min(first - size // 4, len(words) - size))
+    hi = lo + size
+    begin = words[lo].start() if lo else 0
+    finish = words[hi - 1].end() if hi < len(words) else len(text)
+    window = highlight(text[begin:finish], terms, start, end)
+    return f"{ellipsis if lo else ''}{window}{ellipsis if hi < len(words) else ''}"
@@ -0,0 +1,376 @@
+"""
+Bulk import of simulations from the knowledge-base workbook.
+
+Lookups are resolved from in-memory dictionaries and every table is written
+with ``bulk_create``, so an import costs a handful of queries per batch rather
+than several per row.
+
+``import_rows`` loads the whole sheet and writes it in one transaction.
+``import_stream`` reads the workbook row by row and commits it in chunks,
+recording its progress so an interrupted import can be resumed. ``sync_rows``
+matches rows to existing simulations by a stable key and only writes the
+difference. Bulk writes send no model signals, so each path refreshes the read
+model rows (see ``readmodel.py``) of the simulations it wrote.
+"""
+
+import hashlib
+import json
+from collections import Counter
+from itertools import islice
+
+from django.db import connection, transaction
+
+from . import fts
+from .catalog import bump_version_on_commit
+from .changes import ALL, record, record_tags
+from .fts import index_simulation
+from .models import (
+    ImportCheckpoint,
+    RoleTag,
+    Simulation,
+    SimulationDifficulty,
+    SimulationRow,
+    SimulationTopic,
+    SimulationType,
+    WeekTopic,
+)
+from .readmodel import refresh_rows
+
+COLUMNS = ("title", "summary", "week_topic", "type", "difficulty", "role", "simulation_topics")
+DEFAULT_WEEK_TOPIC = "יסודות"
+DEFAULT_TYPE = SimulationType.FORMAL
+DEFAULT_DIFFICULTY = SimulationDifficulty.MEDIUM
+KEY_COLUMN = "key"
+WRITE_BATCH_SIZE = 500
+
+
+def read_workbook(path):
+    """Read the rows of a workbook into dicts keyed by column, with blanks as None."""
+    import pandas as pd
+
+    df = pd.read_excel(path, dtype=object)
+    df = df.astype(object).where(pd.notna(df), None)
+    return df.to_dict("records")
+
+
+def iter_workbook(path):
+    """Stream the rows of a workbook as dicts without loading it into memory."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def workbook_digest(path):
+    """Content hash identifying a workbook across import attempts."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ""
+
+
+def clean_row(raw):
+    """Normalize a raw workbook row, or return None if it should be skipped."""
+    row = {column: _text(raw.get(column)) for column in COLUMNS}
+    if not row["title"] and not row["summary"]:
+        return None
+    row["week_topic"] = row["week_topic"] or DEFAULT_WEEK_TOPIC
+    row["type"] = row["type"] or DEFAULT_TYPE
+    row["difficulty"] = row["difficulty"] or DEFAULT_DIFFICULTY
+    row["role"] = row["role"] or None
+    row["simulation_topics"] = list(
+        dict.fromkeys(t.strip() for t in row["simulation_topics"].split(",") if t.strip())
+    )
+    row["import_key"] = import_key(_text(raw.get(KEY_COLUMN)) or row["title"] or row["summary"])
+    row["content_hash"] = hashlib.sha256(
+        json.dumps([row[column] for column in COLUMNS], ensure_ascii=False).encode()
+    ).hexdigest()
+    return row
+
+
+def import_key(value):
+    """
+    Stable identity of a workbook row across imports.
+
+    Taken from the optional ``key`` column, falling back to the title, so a row
+    keeps its simulation (and id) when any other cell is edited.
+    """
+    return hashlib.sha1(value.encode()).hexdigest()
+
+
+def _numbered(key, number):
+    return key if number == 1 else import_key(f"{key}:{number}")
+
+
+def unique_keys(rows, used=None):
+    """
+    Number the ``import_key`` of cleaned ``rows`` so that no two rows share one.
+
+    Rows sharing a key, e.g. two simulations with the same title and no ``key``
+    cell, are told apart by their order: the second gets the key numbered 2,
+    and so on. ``used`` returns which of the given keys rows before ``rows``
+    already took, so that a workbook can be numbered one chunk at a time.
+    """
+    numbers = [1] * len(rows)
+    pending = list(range(len(rows)))
+    taken = set()
+    while pending:
+        candidates = {i: _numbered(rows[i]["import_key"], numbers[i]) for i in pending}
+        earlier = used(set(candidates.values())) if used is not None else ()
+        retry = []
+        for i in pending:
+            key = candidates[i]
+            if key in earlier or key in taken:
+                numbers[i] += 1
+                retry.append(i)
+            else:
+                taken.add(key)
+                rows[i]["import_key"] = key
+        pending = retry
+    return rows
+
+
+def clean_rows(raw_rows):
+    """Clean raw workbook rows, dropping the rows to skip, with unique keys."""
+    return unique_keys([row for row in map(clean_row, raw_rows) if row is not None])
+
+
+def _imported_keys(keys):
+    """Which of ``keys`` the simulations already hold."""
+    found = set()
+    for batch in _batches(keys):
+        found.update(
+            Simulation.objects.filter(import_key__in=batch).values_list("import_key", flat=True)
+        )
+    return found
+
+
+def _resolve(model, field, names, existing=None, **defaults):
+    """
+    Map each name to its instance, bulk-creating the missing ones.
+
+    ``existing`` is a lookup from a previous call to extend; the table is only
+    read when it is not given.
+    """
+    if existing is None:
+        existing = {getattr(obj, field): obj for obj in model.objects.all()}
+    missing = [
+        model(**{field: name}, **defaults)
+        for name in dict.fromkeys(names)
+        if name not in existing
+    ]
+    for obj in model.objects.bulk_create(missing):
+        existing[getattr(obj, field)] = obj
+    if missing:
+        record_tags(model)
+    return existing
+
+
+def resolve_tags(rows, lookups=(None, None, None)):
+    """Return the week topic, role and topic lookups for ``rows``."""
+    weeks, roles, topics = lookups
+    weeks = _resolve(
+        WeekTopic, "topic", (r["week_topic"] for r in rows), weeks, serial_num=1
+    )
+    roles = _resolve(RoleTag, "name", (r["role"] for r in rows if r["role"]), roles)
+    topics = _resolve(
+        SimulationTopic,
+        "name",
+        (t for r in rows for t in r["simulation_topics"]),
+        topics,
+        type=None,
+    )
+    return weeks, roles, topics
+
+
+def build_simulation(row, weeks, roles):
+    sim = Simulation(
+        title=row["title"],
+        summary=row["summary"],
+        week_topic=weeks[row["week_topic"]],
+        type=row["type"],
+        difficulty=row["difficulty"],
+        role=roles[row["role"]] if row["role"] else None,
+        import_key=row["import_key"],
+        content_hash=row["content_hash"],
+    )
+    # Bulk writes skip pre_save, which computes these on a regular save.
+    index_simulation(sim)
+    return sim
+
+
+def insert_rows(rows, weeks, roles, topics):
+    """Create simulations for cleaned ``rows`` along with their topic links."""
+    simulations = Simulation.objects.bulk_create(
+        build_simulation(row, weeks, roles) for row in rows
+    )
+    _link_topics(simulations, rows, topics)
+    refresh_rows(sim.id for sim in simulations)
+    return simulations
+
+
+def _link_topics(simulations, rows, topics):
+    Through = Simulation.simulation_topics.through
+    Through.objects.bulk_create(
+        Through(simulation_id=sim.id, simulationtopic_id=topics[name].id)
+        for sim, row in zip(simulations, rows)
+        for name in row["simulation_topics"]
+    )
+
+
+def _batches(items, size=WRITE_BATCH_SIZE):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def clear_simulations():
+    """
+    Delete every simulation, its topic links and its read model row.
+
+    Plain SQL, as a queryset delete would load every simulation to send its
+    signals. The whole catalog is recorded as changed.
+    """
+    with connection.cursor() as cursor:
+        for model in (Simulation.simulation_topics.through, SimulationRow):
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+        fts.delete_all(cursor)
+    record(ALL)
+
+
+def import_rows(raw_rows):
+    """Replace every simulation with the given workbook rows in one transaction."""
+    rows = clean_rows(raw_rows)
+    with transaction.atomic():
+        clear_simulations()
+        insert_rows(rows, *resolve_tags(rows))
+        # Bulk writes send no model signals.
+        bump_version_on_commit()
+    return len(rows)
+
+
+def import_stream(raw_rows, source, chunk_size=1000, resume=False):
+    """
+    Replace every simulation with the given workbook rows, one chunk at a time.
+
+    Each chunk is committed in its own transaction together with the number of
+    rows consumed so far, stored in an ``ImportCheckpoint`` keyed by ``source``.
+    With ``resume``, rows up to the last committed chunk are skipped instead of
+    starting over. Yields the total number of rows consumed after each chunk.
+    """
+    checkpoint = ImportCheckpoint.objects.filter(source=source).first() if resume else None
+    if checkpoint is None:
+        with transaction.atomic():
+            clear_simulations()
+            bump_version_on_commit()
+            checkpoint, _ = ImportCheckpoint.objects.update_or_create(
+                source=source, defaults={"rows_done": 0}
+            )
+
+    raw_rows = islice(raw_rows, checkpoint.rows_done, None)
+    lookups = (None, None, None)
+    while chunk := list(islice(raw_rows, chunk_size)):
+        rows = [row for row in map(clean_row, chunk) if row is not None]
+        with transaction.atomic():
+            # Keys are numbered against the rows imported so far, as in a full
+            # import, without holding them in memory.
+            unique_keys(rows, _imported_keys)
+            lookups = resolve_tags(rows, lookups)
+            insert_rows(rows, *lookups)
+            checkpoint.rows_done += len(chunk)
+            checkpoint.save(update_fields=["rows_done", "updated_at"])
+            bump_version_on_commit()
+        yield checkpoint.rows_done
+
+    checkpoint.delete()
+
+
+def sync_rows(raw_rows):
+    """
+    Bring the simulations in line with the given workbook rows, in bulk.
+
+    Rows are matched to simulations by ``import_key``. New rows are inserted,
+    rows whose ``content_hash`` changed are updated in place (keeping their id),
+    and simulations with no matching row are deleted. Simulations imported
+    before keys were recorded are matched by title, in id order when titles
+    repeat. Returns a summary with the
+    ``created``, ``updated``, ``deleted`` and ``unchanged`` counts.
+    """
+    rows = {row["import_key"]: row for row in clean_rows(raw_rows)}
+
+    with transaction.atomic():
+        existing = {}
+        stale_ids = []
+        seen_titles = Counter()
+        for sim_id, key, title, content_hash in Simulation.objects.order_by("id").values_list(
+            "id", "import_key", "title", "content_hash"
+        ):
+            if not key:
+                key = import_key(title)
+                seen_titles[key] += 1
+                key = _numbered(key, seen_titles[key])
+            if key in existing or key not in rows:
+                stale_ids.append(sim_id)
+            else:
+                existing[key] = (sim_id, content_hash)
+
+        created = [row for key, row in rows.items() if key not in existing]
+        changed = [
+            (existing[key][0], row)
+            for key, row in rows.items()
+            if key in existing and existing[key][1] != row["content_hash"]
+        ]
+
+        for batch in _batches(stale_ids):
+            Simulation.objects.filter(id__in=batch).delete()
+
+        weeks, roles, topics = resolve_tags(created + [row for _, row in changed])
+        insert_rows(created, weeks, roles, topics)
+
+        updated = []
+        for sim_id, row in changed:
+            sim = build_simulation(row, weeks, roles)
+            sim.id = sim_id
+            updated.append(sim)
+        Simulation.objects.bulk_update(
+            updated,
+            [
+                "title",
+                "summary",
+                "week_topic",
+                "type",
+                "difficulty",
+                "role",
+                "import_key",
+                "content_hash",
+                "title_terms",
+                "search_terms",
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+        Through = Simulation.simulation_topics.through
+        for batch in _batches(sim.id for sim in updated):
+            Through.objects.filter(simulation_id__in=batch).delete()
+        _link_topics(updated, [row for _, row in changed], topics)
+        refresh_rows(sim.id for sim in updated)
+
+        if created or updated or stale_ids:
+            bump_version_on_commit()
+
+    return {
+        "created": len(created),
+        "updated": len(updated),
+        "deleted": len(stale_ids),
+        "unchanged": len(existing) - len(updated),
+    }
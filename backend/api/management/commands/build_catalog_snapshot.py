@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.snapshot import KEEP_SNAPSHOTS, build_snapshot, snapshot_dir
+
+
+class Command(BaseCommand):
+    help = "Write the /api/all payload to a content-hashed static file and update the manifest."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            help="Directory to write to (defaults to CATALOG_SNAPSHOT_DIR).",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=KEEP_SNAPSHOTS,
+            help="Number of snapshots to keep, including the new one.",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["dir"] or snapshot_dir()
+        manifest = build_snapshot(directory, keep=max(options["keep"], 1))
+        self.stdout.write(f"Wrote {manifest['file']} ({manifest['size']} bytes) to {directory}.")
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.changes import compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Forget catalog changes older than the given age. Clients holding an older "
+        "version get the full catalog on their next sync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Keep the changes of this many last days.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = compact(timezone.now() - timedelta(days=options["days"]))
+        self.stdout.write(f"Removed {deleted} changes.")
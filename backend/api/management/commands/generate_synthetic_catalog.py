@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Simulation
+from api.synthetic import generate_catalog, tag_counts
+
+
+class Command(BaseCommand):
+    help = "Replace the catalog with synthetic simulations and tags, for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size", type=int, required=True, help="Number of simulations."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed; equal seeds give equal catalogs."
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete an existing catalog instead of refusing to run.",
+        )
+
+    def handle(self, *args, **options):
+        size = options["size"]
+        if size < 0:
+            raise CommandError("--size must not be negative.")
+        if Simulation.objects.exists() and not options["replace"]:
+            raise CommandError("The catalog is not empty; pass --replace to delete it.")
+
+        types, topics, roles, weeks = tag_counts(size)
+        self.stdout.write(
+            f"Generating {size} simulations with {topics} topics of {types} types, "
+            f"{roles} roles and {weeks} week topics."
+        )
+        start = time.perf_counter()
+
+        def progress(written):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {written}/{size}")
+
+        written = generate_catalog(size, seed=options["seed"], progress=progress)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Wrote {written} simulations in {elapsed:.1f}s "
+            f"({written / elapsed if elapsed else 0:.0f} rows/s)."
+        )
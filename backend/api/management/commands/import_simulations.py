@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.importer import (
+    import_rows,
+    import_stream,
+    iter_workbook,
+    read_workbook,
+    sync_rows,
+    workbook_digest,
+)
+
+
+class Command(BaseCommand):
+    help = "Replace all simulations with the rows of a knowledge-base workbook."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the .xlsx workbook.")
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Only insert new rows, update changed rows and delete removed ones.",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Read the workbook row by row and commit it in chunks, in constant memory.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Rows per transaction in streaming mode (default: 1000).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted streaming import from its last committed chunk.",
+        )
+
+    def handle(self, *args, path, sync, stream, chunk_size, resume, **options):
+        start = time.perf_counter()
+        if sync:
+            summary = sync_rows(read_workbook(path))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Synced in {elapsed:.2f}s: {created} created, {updated} updated, "
+                    "{deleted} deleted, {unchanged} unchanged".format(
+                        elapsed=elapsed, **summary
+                    )
+                )
+            )
+            return
+        if stream or resume:
+            count = 0
+            for count in import_stream(
+                iter_workbook(path), workbook_digest(path), chunk_size, resume
+            ):
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{count} rows committed ({count / elapsed:.0f} rows/s)")
+        else:
+            count = import_rows(read_workbook(path))
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {count} rows in {elapsed:.2f}s "
+                f"({count / elapsed:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.catalog import bump_version
+from api.models import SimulationRow
+from api.readmodel import rebuild_rows
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized simulation rows served by the API."
+
+    def handle(self, *args, **options):
+        rebuild_rows()
+        bump_version()
+        self.stdout.write(f"Rebuilt {SimulationRow.objects.count()} rows.")
@@ -0,0 +1,268 @@
+"""
+Operational metrics of the api app, in the Prometheus text format.
+
+``middleware.TimingMiddleware`` reports every ``/api/`` request here, labelled
+with the route of its view:
+
+    api_requests_total                 by view and status
+    api_request_duration_seconds       histogram, by view
+    api_request_queries                histogram, by view
+    api_request_db_seconds_total       by view
+    api_response_bytes                 histogram, by view
+    api_catalog_cache_total            by view and result (hit or miss)
+
+Each worker process keeps its own totals in memory and writes them to
+``<pid>-<token>.json`` in ``API_METRICS_DIR`` at most every
+``API_METRICS_FLUSH_INTERVAL`` seconds; the random token tells apart processes
+that were given the same pid. ``/metrics`` adds up the files of every process,
+so a scrape sees the whole server whichever worker answers it.
+
+The files of exited workers are folded into ``archived.json`` and removed, by a
+new worker's first flush or by a scrape, so that totals never go backwards while
+the directory holds one file per live worker.
+"""
+
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+ARCHIVE_FILE = "archived.json"
+LOCK_FILE = ".lock"
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+BYTES_BUCKETS = tuple(2**i for i in range(8, 27, 2))
+HISTOGRAMS = {
+    "api_request_duration_seconds": DURATION_BUCKETS,
+    "api_request_queries": QUERY_BUCKETS,
+    "api_response_bytes": BYTES_BUCKETS,
+}
+HELP = {
+    "api_requests_total": "API requests by view and status.",
+    "api_request_duration_seconds": "Wall time of API requests.",
+    "api_request_queries": "Database queries per API request.",
+    "api_request_db_seconds_total": "Database time of API requests.",
+    "api_response_bytes": "Size of API response bodies, as sent.",
+    "api_catalog_cache_total": "Catalog payload cache lookups by result.",
+}
+
+_lock = threading.Lock()
+# metric name -> label string -> value; histograms hold
+# [bucket counts..., +Inf count, sum] with non-cumulative counts.
+_values = {}
+_last_flush = 0.0
+# The file name of this process, and the pid it was chosen in.
+_file_name = None
+_file_pid = None
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _inc(name, labels, amount=1):
+    series = _values.setdefault(name, {})
+    series[labels] = series.get(labels, 0) + amount
+
+
+def _observe(name, labels, value):
+    buckets = HISTOGRAMS[name]
+    series = _values.setdefault(name, {})
+    counts = series.setdefault(labels, [0] * (len(buckets) + 2))
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            counts[i] += 1
+            break
+    else:
+        counts[len(buckets)] += 1
+    counts[-1] += value
+
+
+def observe_request(view, status, request_timing):
+    """Record a finished request, timed by ``request_timing``."""
+    labels = _labels(view=view)
+    with _lock:
+        _inc("api_requests_total", _labels(view=view, status=status))
+        _observe("api_request_duration_seconds", labels, request_timing.elapsed())
+        if request_timing.queries is not None:
+            _observe("api_request_queries", labels, request_timing.queries)
+            _inc("api_request_db_seconds_total", labels, request_timing.db_time)
+        if request_timing.bytes is not None:
+            _observe("api_response_bytes", labels, request_timing.bytes)
+        for name, _, desc in request_timing.metrics:
+            if name == "cache":
+                _inc("api_catalog_cache_total", _labels(view=view, result=desc))
+    if time.monotonic() - _last_flush >= settings.API_METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def metrics_dir():
+    return Path(settings.API_METRICS_DIR)
+
+
+def _own_file_name():
+    """The metrics file of this process, chosen afresh in a forked child."""
+    global _file_name, _file_pid
+    pid = os.getpid()
+    if _file_pid != pid:
+        _file_name = f"{pid}-{uuid.uuid4().hex[:12]}.json"
+        _file_pid = pid
+        return _file_name, True
+    return _file_name, False
+
+
+def _alive(path):
+    """Whether the process that wrote the metrics file ``path`` is still running."""
+    pid = int(path.stem.partition("-")[0])
+    if pid == os.getpid():
+        return path.name == _file_name
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Running as another user.
+        return True
+    return True
+
+
+@contextmanager
+def _directory_lock(directory):
+    """Serialize the processes reading and archiving the files of ``directory``."""
+    if fcntl is None:
+        yield
+        return
+    with open(directory / LOCK_FILE, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write(path, content):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        # Removed or replaced while being read.
+        return {}
+
+
+def _merge(totals, values):
+    for name, series in values.items():
+        merged = totals.setdefault(name, {})
+        for labels, value in series.items():
+            if name in HISTOGRAMS:
+                current = merged.get(labels, [0] * len(value))
+                merged[labels] = [a + b for a, b in zip(current, value)]
+            else:
+                merged[labels] = merged.get(labels, 0) + value
+
+
+def _process_files(directory):
+    return [path for path in directory.glob("*.json") if path.stem.partition("-")[0].isdigit()]
+
+
+def _archive_exited(directory):
+    """Fold the files of exited processes into the archive; call under the lock."""
+    exited = [path for path in _process_files(directory) if not _alive(path)]
+    if not exited:
+        return
+    archive = directory / ARCHIVE_FILE
+    totals = _read(archive)
+    for path in exited:
+        _merge(totals, _read(path))
+    _write(archive, json.dumps(totals))
+    for path in exited:
+        path.unlink(missing_ok=True)
+
+
+def flush():
+    """Write this process's totals to its file in ``API_METRICS_DIR``."""
+    global _last_flush
+    with _lock:
+        _last_flush = time.monotonic()
+        content = json.dumps(_values)
+    directory = metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name, first = _own_file_name()
+    _write(directory / name, content)
+    if first:
+        with _directory_lock(directory):
+            _archive_exited(directory)
+
+
+@atexit.register
+def _flush_at_exit():
+    if _values:
+        flush()
+
+
+def collect():
+    """The totals of every process that wrote a metrics file, added up."""
+    flush()
+    directory = metrics_dir()
+    totals = {}
+    with _directory_lock(directory):
+        _archive_exited(directory)
+        for path in [directory / ARCHIVE_FILE, *_process_files(directory)]:
+            _merge(totals, _read(path))
+    return totals
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(totals):
+    """Format ``collect()`` totals in the Prometheus text exposition format."""
+    lines = []
+    for name in HELP:
+        series = totals.get(name)
+        if not series:
+            continue
+        kind = "histogram" if name in HISTOGRAMS else "counter"
+        lines += [f"# HELP {name} {HELP[name]}", f"# TYPE {name} {kind}"]
+        for labels, value in sorted(series.items()):
+            if kind == "counter":
+                lines.append(f"{name}{{{labels}}} {_number(value)}")
+                continue
+            *counts, total = value
+            cumulative = 0
+            for bound, count in zip([*HISTOGRAMS[name], math.inf], counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {_number(total)}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return "\n".join(lines) + "\n"
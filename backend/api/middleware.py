@@ -0,0 +1,132 @@
+"""
+Request timing for the api app.
+
+``TimingMiddleware`` records the wall time, database time, query count and
+response size of ``/api/`` requests (see ``timing.py``). It reports them in a
+``Server-Timing`` header, which browsers show in their network panel, and in
+one log line per request on the ``api.timing`` logger. With ``API_METRICS`` on,
+it also adds every request to the totals served by ``/metrics`` (see
+``metrics.py``).
+
+Headers and log lines are configured by ``API_TIMING`` and
+``API_TIMING_SAMPLE_RATE``. With timing off, queries are not timed and metrics
+go without query counts and database time. When both timing and metrics are
+off, the middleware removes itself from the stack at startup, so it costs
+nothing.
+"""
+
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics, timing
+
+logger = logging.getLogger("api.timing")
+
+
+class TimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.time_queries = settings.API_TIMING
+        self.sample_rate = settings.API_TIMING_SAMPLE_RATE if self.time_queries else 0
+        self.metrics = settings.API_METRICS
+        if self.sample_rate <= 0 and not self.metrics:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.API_TIMING_PATH_PREFIX
+        if self.time_queries:
+            timing.install()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        """The timing of ``request`` if it is measured at all, or None."""
+        if not request.path.startswith(self.prefix):
+            return None
+        request_timing = timing.RequestTiming(self.time_queries)
+        request_timing.sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        if not (request_timing.sampled or self.metrics):
+            return None
+        return request_timing
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_timing = self._start(request)
+        if request_timing is None:
+            return self.get_response(request)
+        with timing.timing_request(request_timing):
+            response = self.get_response(request)
+        return self._finish(request, response, request_timing)
+
+    async def __acall__(self, request):
+        request_timing = self._start(request)
+        if request_timing is None:
+            return await self.get_response(request)
+        with timing.timing_request(request_timing):
+            response = await self.get_response(request)
+        return self._finish(request, response, request_timing)
+
+    def _finish(self, request, response, request_timing):
+        if response.streaming:
+            # Queries run while streaming; the request is recorded at the end.
+            if request_timing.sampled:
+                response["Server-Timing"] = request_timing.server_timing()
+            stream = self._astream if response.is_async else self._stream
+            content = stream(response.streaming_content, request, response, request_timing)
+            response.streaming_content = content
+            return response
+        request_timing.bytes = len(response.content)
+        if request_timing.sampled:
+            response["Server-Timing"] = request_timing.server_timing()
+        self._record(request, response, request_timing)
+        return response
+
+    def _stream(self, content, request, response, request_timing):
+        request_timing.bytes = 0
+        with timing.timing_request(request_timing):
+            for chunk in content:
+                request_timing.bytes += len(chunk)
+                yield chunk
+        self._record(request, response, request_timing)
+
+    async def _astream(self, content, request, response, request_timing):
+        request_timing.bytes = 0
+        with timing.timing_request(request_timing):
+            async for chunk in content:
+                request_timing.bytes += len(chunk)
+                yield chunk
+        self._record(request, response, request_timing)
+
+    def _record(self, request, response, request_timing):
+        if self.metrics:
+            match = request.resolver_match
+            view = match.route if match is not None else "unmatched"
+            metrics.observe_request(view, response.status_code, request_timing)
+        if request_timing.sampled:
+            self._log(request, response, request_timing)
+
+    def _log(self, request, response, request_timing):
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(request_timing.elapsed() * 1000, 1),
+            "db_ms": round(request_timing.db_time * 1000, 1),
+            "queries": request_timing.queries,
+            "bytes": request_timing.bytes,
+        }
+        for name, duration, desc in request_timing.metrics:
+            if duration is not None:
+                fields[f"{name}_ms"] = round(duration * 1000, 1)
+            if desc is not None:
+                fields[name] = desc
+        logger.info(
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"timing": fields},
+        )
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_load_simulations_from_excel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=64, unique=True, verbose_name='מקור')),
+                ('rows_done', models.PositiveIntegerField(default=0, verbose_name='שורות שיובאו')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='עודכן')),
+            ],
+            options={
+                'verbose_name': 'נקודת שמירה של ייבוא',
+                'verbose_name_plural': 'נקודות שמירה של ייבוא',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='גיבוב תוכן'),
+        ),
+        migrations.AddField(
+            model_name='simulation',
+            name='import_key',
+            field=models.CharField(blank=True, default='', max_length=40, verbose_name='מפתח ייבוא'),
+        ),
+        migrations.AddIndex(
+            model_name='simulation',
+            index=models.Index(fields=['import_key'], name='api_simulat_import__212b0d_idx'),
+        ),
+    ]
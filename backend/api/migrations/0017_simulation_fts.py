@@ -0,0 +1,62 @@
+from django.db import migrations
+
+# External-content FTS5 index over api_simulation, kept in sync by triggers so
+# that bulk writes, which send no model signals, are indexed too.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE api_simulation_fts USING fts5(
+        title, summary, author,
+        content='api_simulation', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER api_simulation_fts_insert AFTER INSERT ON api_simulation BEGIN
+        INSERT INTO api_simulation_fts(rowid, title, summary, author)
+        VALUES (new.id, new.title, new.summary, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER api_simulation_fts_delete AFTER DELETE ON api_simulation BEGIN
+        INSERT INTO api_simulation_fts(api_simulation_fts, rowid, title, summary, author)
+        VALUES ('delete', old.id, old.title, old.summary, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER api_simulation_fts_update AFTER UPDATE ON api_simulation BEGIN
+        INSERT INTO api_simulation_fts(api_simulation_fts, rowid, title, summary, author)
+        VALUES ('delete', old.id, old.title, old.summary, old.author);
+        INSERT INTO api_simulation_fts(rowid, title, summary, author)
+        VALUES (new.id, new.title, new.summary, new.author);
+    END
+    """,
+    "INSERT INTO api_simulation_fts(api_simulation_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS api_simulation_fts_insert",
+    "DROP TRIGGER IF EXISTS api_simulation_fts_delete",
+    "DROP TRIGGER IF EXISTS api_simulation_fts_update",
+    "DROP TABLE IF EXISTS api_simulation_fts",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_simulation_import_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL), reverse_code=run_on_sqlite(DROP_SQL)),
+    ]
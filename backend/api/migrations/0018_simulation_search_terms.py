@@ -0,0 +1,127 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:42
+
+import importlib
+import re
+import unicodedata
+from itertools import islice
+
+from django.db import migrations, models
+
+fts_0017 = importlib.import_module("api.migrations.0017_simulation_fts")
+
+# The index now mirrors the normalized terms instead of the raw text.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE api_simulation_fts USING fts5(
+        title_terms, search_terms,
+        content='api_simulation', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 0'
+    )
+    """,
+    """
+    CREATE TRIGGER api_simulation_fts_insert AFTER INSERT ON api_simulation BEGIN
+        INSERT INTO api_simulation_fts(rowid, title_terms, search_terms)
+        VALUES (new.id, new.title_terms, new.search_terms);
+    END
+    """,
+    """
+    CREATE TRIGGER api_simulation_fts_delete AFTER DELETE ON api_simulation BEGIN
+        INSERT INTO api_simulation_fts(api_simulation_fts, rowid, title_terms, search_terms)
+        VALUES ('delete', old.id, old.title_terms, old.search_terms);
+    END
+    """,
+    """
+    CREATE TRIGGER api_simulation_fts_update AFTER UPDATE ON api_simulation BEGIN
+        INSERT INTO api_simulation_fts(api_simulation_fts, rowid, title_terms, search_terms)
+        VALUES ('delete', old.id, old.title_terms, old.search_terms);
+        INSERT INTO api_simulation_fts(rowid, title_terms, search_terms)
+        VALUES (new.id, new.title_terms, new.search_terms);
+    END
+    """,
+    "INSERT INTO api_simulation_fts(api_simulation_fts) VALUES ('rebuild')",
+]
+
+
+# hebrew.index_terms as of this migration, frozen so that later changes to the
+# normalization do not change what the migration does.
+_MARKS = "\u0591-\u05bd\u05bf\u05c1\u05c2\u05c4\u05c5\u05c7"
+_QUOTES = "\"'\u05f3\u05f4\u2018\u2019\u201c\u201d"
+WORD = re.compile(rf"[\w{_MARKS}]+(?:[{_QUOTES}][\w{_MARKS}]+)*")
+DROP = re.compile(rf"[{_QUOTES}_]")
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+PREFIX_LETTERS = frozenset("והבלמשכ")
+MAX_PREFIX_LENGTH = 3
+MIN_STEM_LENGTH = 2
+
+
+def normalize_word(word):
+    word = unicodedata.normalize("NFKD", word)
+    word = "".join(ch for ch in word if not unicodedata.combining(ch))
+    return DROP.sub("", word).translate(FINAL_LETTERS).casefold()
+
+
+def index_terms(*texts):
+    terms = {}
+    for text in texts:
+        for match in WORD.finditer(text):
+            word = normalize_word(match.group())
+            if not word:
+                continue
+            terms[word] = None
+            for i in range(1, MAX_PREFIX_LENGTH + 1):
+                if len(word) - i < MIN_STEM_LENGTH or word[i - 1] not in PREFIX_LETTERS:
+                    break
+                terms[word[i:]] = None
+    return " ".join(terms)
+
+
+def compute_search_terms(apps, schema_editor):
+    Simulation = apps.get_model("api", "Simulation")
+    rows = Simulation.objects.order_by("id").values_list("id", "title", "summary", "author")
+    rows = rows.iterator(chunk_size=500)
+    while batch := list(islice(rows, 500)):
+        Simulation.objects.bulk_update(
+            [
+                Simulation(
+                    id=sim_id,
+                    title_terms=index_terms(title),
+                    search_terms=index_terms(summary, author),
+                )
+                for sim_id, title, summary, author in batch
+            ],
+            ["title_terms", "search_terms"],
+        )
+
+
+def recreate_index(create_sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in fts_0017.DROP_SQL + create_sql:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_simulation_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='search_terms',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='simulation',
+            name='title_terms',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(compute_search_terms, reverse_code=migrations.RunPython.noop),
+        migrations.RunPython(
+            recreate_index(CREATE_SQL), reverse_code=recreate_index(fts_0017.CREATE_SQL)
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+
+def populate_rows(apps, schema_editor):
+    """Build the read model; mirrors ``serializers.serialize_simulation``."""
+    Simulation = apps.get_model("api", "Simulation")
+    SimulationRow = apps.get_model("api", "SimulationRow")
+    simulations = (
+        Simulation.objects.select_related("week_topic", "role")
+        .prefetch_related("simulation_topics")
+        .order_by("id")
+    )
+    rows = []
+    for sim in simulations.iterator(chunk_size=500):
+        role = sim.role.name if sim.role else None
+        rows.append(
+            SimulationRow(
+                id=sim.id,
+                title=sim.title or f"{sim.author} - {role or 'כללי'}",
+                summary=sim.summary,
+                author=sim.author,
+                url=sim.url,
+                week_topic=sim.week_topic.topic,
+                type=sim.type,
+                difficulty=sim.difficulty,
+                role=role,
+                simulation_topics=[t.name for t in sim.simulation_topics.all()],
+            )
+        )
+    SimulationRow.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_simulation_search_terms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationRow',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=400)),
+                ('summary', models.TextField(blank=True, default='')),
+                ('author', models.CharField(max_length=100)),
+                ('url', models.CharField(max_length=200)),
+                ('week_topic', models.CharField(max_length=80)),
+                ('type', models.CharField(max_length=20)),
+                ('difficulty', models.CharField(max_length=10)),
+                ('role', models.CharField(max_length=80, null=True)),
+                ('simulation_topics', models.JSONField(default=list)),
+            ],
+            options={
+                'verbose_name': 'שורת סימולציה',
+                'verbose_name_plural': 'שורות סימולציות',
+                'indexes': [models.Index(fields=['type'], name='api_simulat_type_f67a64_idx'), models.Index(fields=['difficulty'], name='api_simulat_difficu_e98fec_idx'), models.Index(fields=['week_topic'], name='api_simulat_week_to_10a0a0_idx'), models.Index(fields=['role'], name='api_simulat_role_fd0b61_idx')],
+            },
+        ),
+        migrations.RunPython(populate_rows, reverse_code=migrations.RunPython.noop),
+    ]
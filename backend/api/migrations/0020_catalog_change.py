@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+def record_baseline(apps, schema_editor):
+    """Mark the existing catalog as one change to everything (changes.ALL)."""
+    CatalogChange = apps.get_model("api", "CatalogChange")
+    CatalogChange.objects.create(resource="all")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_simulation_row'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=20, verbose_name='משאב')),
+                ('object_id', models.BigIntegerField(null=True, verbose_name='מזהה')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='נוצר')),
+            ],
+            options={
+                'verbose_name': 'שינוי בקטלוג',
+                'verbose_name_plural': 'שינויים בקטלוג',
+            },
+        ),
+        migrations.RunPython(record_baseline, reverse_code=migrations.RunPython.noop),
+    ]
@@ -120,6 +120,11 @@ class Simulation(models.Model):
         verbose_name="נושאי סימולציה",
         blank=True,
     )
+    import_key = models.CharField("מפתח ייבוא", max_length=40, blank=True, default="")
+    content_hash = models.CharField("גיבוב תוכן", max_length=64, blank=True, default="")
+    # Normalized search terms (see hebrew.py), mirrored into the full-text index.
+    title_terms = models.TextField(blank=True, default="", editable=False)
+    search_terms = models.TextField(blank=True, default="", editable=False)
 
     class Meta:
         verbose_name = "סימולציה"
@@ -128,10 +133,88 @@ class Simulation(models.Model):
             models.Index(fields=["type"]),
             models.Index(fields=["difficulty"]),
             models.Index(fields=["author"]),
+            models.Index(fields=["import_key"]),
         ]
 
+    # The search terms derived from each field, by fts.index_simulation.
+    DERIVED_FIELDS = {
+        "title": ("title_terms",),
+        "summary": ("search_terms",),
+        "author": ("search_terms",),
+    }
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # The terms are recomputed before every save, so a partial save of a
+        # field they derive from must write them too.
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            for field in list(update_fields):
+                update_fields.update(self.DERIVED_FIELDS.get(field, ()))
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     def __str__(self):
         if self.title:
             return self.title
         role = self.role if self.role is not None else "כללי"
         return f"{self.author} - {role}"
+
+
+class SimulationRow(models.Model):
+    """A simulation with its tags resolved, as served by the API (see readmodel.py)."""
+
+    # The id of the simulation.
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=400)
+    summary = models.TextField(blank=True, default="")
+    author = models.CharField(max_length=100)
+    url = models.CharField(max_length=200)
+    week_topic = models.CharField(max_length=80)
+    type = models.CharField(max_length=20)
+    difficulty = models.CharField(max_length=10)
+    role = models.CharField(max_length=80, null=True)
+    simulation_topics = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name = "שורת סימולציה"
+        verbose_name_plural = "שורות סימולציות"
+        indexes = [
+            models.Index(fields=["type"]),
+            models.Index(fields=["difficulty"]),
+            models.Index(fields=["week_topic"]),
+            models.Index(fields=["role"]),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class CatalogChange(models.Model):
+    """A change to the catalog, recorded for delta sync (see changes.py)."""
+
+    # One of serializers.CATALOG_RESOURCES.
+    resource = models.CharField("משאב", max_length=20)
+    # The id of the changed simulation; null for the tag resources.
+    object_id = models.BigIntegerField("מזהה", null=True)
+    created_at = models.DateTimeField("נוצר", auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "שינוי בקטלוג"
+        verbose_name_plural = "שינויים בקטלוג"
+
+    def __str__(self):
+        return f"{self.id}: {self.resource} {self.object_id or ''}".rstrip()
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of a streaming workbook import, used to resume after a failure."""
+
+    source = models.CharField("מקור", max_length=64, unique=True)
+    rows_done = models.PositiveIntegerField("שורות שיובאו", default=0)
+    updated_at = models.DateTimeField("עודכן", auto_now=True)
+
+    class Meta:
+        verbose_name = "נקודת שמירה של ייבוא"
+        verbose_name_plural = "נקודות שמירה של ייבוא"
+
+    def __str__(self):
+        return f"{self.source[:12]} ({self.rows_done})"
@@ -0,0 +1,101 @@
+"""Query-string parsing shared by the sync and async views."""
+
+from .serializers import CATALOG_RESOURCES, SIMULATION_FIELDS
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SIMULATIONS_PAGE_SIZE = 100
+SIMULATIONS_MAX_PAGE_SIZE = 1000
+STREAM_FORMATS = ("ndjson", "json")
+CATALOG_FORMATS = ("compact",)
+
+
+def int_param(params, name, default, minimum=0, maximum=None):
+    """Read an integer parameter, raising ``ValueError`` if it is malformed or out of range."""
+    value = params.get(name)
+    if value is None:
+        return default
+    value = int(value)
+    if value < minimum or (maximum is not None and value > maximum):
+        raise ValueError(f"{name} out of range")
+    return value
+
+
+def choice_list_param(params, name, choices):
+    """
+    Read a comma-separated (or repeated) parameter whose values are ``choices``.
+
+    Returns the chosen values in the order of ``choices``, or ``choices`` itself
+    when the parameter is absent. Raises ``ValueError`` on unknown values.
+    """
+    if name not in params:
+        return choices
+    values = {v.strip() for value in params.getlist(name) for v in value.split(",")}
+    values.discard("")
+    if unknown := values.difference(choices):
+        raise ValueError(f"unknown {name}: {', '.join(sorted(unknown))}")
+    return tuple(choice for choice in choices if choice in values)
+
+
+def fields_param(params):
+    """The simulation fields selected by ``fields``; ``id`` is always included."""
+    fields = choice_list_param(params, "fields", SIMULATION_FIELDS)
+    return tuple(f for f in SIMULATION_FIELDS if f == "id" or f in fields)
+
+
+def include_param(params):
+    """The resources of ``/api/all`` selected by ``include``."""
+    return choice_list_param(params, "include", CATALOG_RESOURCES)
+
+
+def format_param(params):
+    """The alternative catalog format requested by ``format``, or None."""
+    catalog_format = params.get("format")
+    if catalog_format is not None and catalog_format not in CATALOG_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(CATALOG_FORMATS)}")
+    return catalog_format
+
+
+def payload_key(name, include=CATALOG_RESOURCES, fields=SIMULATION_FIELDS, format=None):
+    """The cached payload key of a response, naming the selections that are not defaults."""
+    key = name if format is None else f"{name}:{format}"
+    if include != CATALOG_RESOURCES:
+        key += f":include={','.join(include)}"
+    if fields != SIMULATION_FIELDS:
+        key += f":fields={','.join(fields)}"
+    return key
+
+
+def listing_params(params):
+    """
+    Parse how ``/api/simulations`` should respond.
+
+    Returns ``(stream, page)``: the requested stream format or None, and a
+    ``(limit, cursor)`` pair when keyset pagination is requested or None.
+    """
+    stream = params.get("stream")
+    paginate = "limit" in params or "cursor" in params
+    if stream is not None:
+        if stream not in STREAM_FORMATS:
+            raise ValueError(f"stream must be one of {', '.join(STREAM_FORMATS)}")
+        if paginate:
+            raise ValueError("stream cannot be paginated")
+        return stream, None
+    if not paginate:
+        return None, None
+    limit = int_param(params, "limit", SIMULATIONS_PAGE_SIZE, 1, SIMULATIONS_MAX_PAGE_SIZE)
+    cursor = int_param(params, "cursor", 0)
+    return None, (limit, cursor)
+
+
+def search_params(params):
+    """Parse the full-text query and the keyword arguments of ``SearchIndex.search``."""
+    return params.get("q", "").strip(), {
+        "simulation_topics": params.getlist("simulation_topics"),
+        "week_topics": params.getlist("week_topic"),
+        "roles": params.getlist("role"),
+        "types": params.getlist("type") if "type" in params else None,
+        "difficulties": params.getlist("difficulty") if "difficulty" in params else None,
+        "limit": int_param(params, "limit", SEARCH_PAGE_SIZE, 1, SEARCH_MAX_PAGE_SIZE),
+        "offset": int_param(params, "offset", 0),
+    }
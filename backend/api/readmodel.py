@@ -0,0 +1,84 @@
+"""
+Denormalized read model of the simulations.
+
+``SimulationRow`` holds every simulation exactly as the API serves it: tag
+names resolved and topics stored as a JSON array of names. Listing, filtering
+and streaming simulations read that one table, with no joins or prefetches.
+
+Rows are rebuilt from the normalized tables whenever a simulation, its topic
+links or one of its tags changes. Signal handlers only record the affected
+simulation ids; the rows are rebuilt together, and the catalog version bumped,
+once the transaction commits. Bulk writes, which send no signals, call
+``refresh_rows`` themselves.
+"""
+
+import threading
+from itertools import islice
+
+from django.db import transaction
+
+from .catalog import bump_version
+from .changes import ALL, SIMULATIONS, record
+from .models import Simulation, SimulationRow
+from .serializers import serialize_simulation, simulation_queryset
+
+REFRESH_BATCH_SIZE = 500
+
+_pending = threading.local()
+
+
+def _write_rows(ids):
+    rows = [
+        SimulationRow(**serialize_simulation(sim))
+        for sim in simulation_queryset().filter(id__in=ids)
+    ]
+    SimulationRow.objects.filter(id__in=ids).delete()
+    SimulationRow.objects.bulk_create(rows)
+
+
+def refresh_rows(ids):
+    """
+    Rebuild the rows of the simulations ``ids`` from the normalized tables.
+
+    Rows of simulations that no longer exist are deleted. Every id is recorded
+    in the change log.
+    """
+    ids = iter(sorted(ids))
+    with transaction.atomic():
+        while batch := list(islice(ids, REFRESH_BATCH_SIZE)):
+            _write_rows(batch)
+            record(SIMULATIONS, batch)
+
+
+def rebuild_rows():
+    """Rebuild the whole read model, recorded as one change to the whole catalog."""
+    ids = Simulation.objects.order_by("id").values_list("id", flat=True).iterator()
+    with transaction.atomic():
+        SimulationRow.objects.all().delete()
+        while batch := list(islice(ids, REFRESH_BATCH_SIZE)):
+            _write_rows(batch)
+        record(ALL)
+
+
+def refresh_on_commit(ids):
+    """
+    Rebuild the rows of ``ids`` once the current transaction commits.
+
+    Ids recorded during one transaction are refreshed together, then the
+    catalog version is bumped, so no payload is ever cached from stale rows
+    under a new version. Ids left over from a rolled-back transaction are
+    refreshed with the next commit, which is harmless.
+    """
+    pending = getattr(_pending, "ids", None)
+    if pending is None:
+        pending = _pending.ids = set()
+    pending.update(ids)
+    transaction.on_commit(_refresh_pending)
+
+
+def _refresh_pending():
+    ids = getattr(_pending, "ids", None)
+    if ids:
+        _pending.ids = set()
+        refresh_rows(ids)
+        bump_version()
@@ -0,0 +1,51 @@
+"""
+JSON rendering for the API.
+
+Uses ``orjson`` when it is installed and the standard library otherwise. Both
+emit UTF-8 directly rather than escaping the Hebrew text to ``\\uXXXX``, which
+would roughly triple the size of every string.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CONTENT_TYPE = "application/json; charset=utf-8"
+NDJSON_CONTENT_TYPE = "application/x-ndjson; charset=utf-8"
+
+_default = DjangoJSONEncoder().default
+
+
+def dumps(data):
+    """Encode ``data`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def dumps_chunk(items, ndjson=False):
+    """
+    Encode a chunk of a streamed response.
+
+    As newline-terminated JSON lines with ``ndjson``, otherwise as the
+    comma-separated elements of a JSON array.
+    """
+    if ndjson:
+        return b"".join(dumps(item) + b"\n" for item in items)
+    return b",".join(dumps(item) for item in items)
+
+
+class FastJsonResponse(HttpResponse):
+    """A ``JsonResponse`` replacement rendered with ``dumps``; accepts any data."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", CONTENT_TYPE)
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,236 @@
+"""
+Server-side ranking of simulations, backed by an in-memory inverted index.
+
+The scoring mirrors ``prioritizeSimulation`` in
+``frontend/src/utils/searchAlgorithm.js``:
+
+    Simulation topic    +1 (per match)
+    Week topic          +2
+    Role                +2
+
+Type and difficulty are hard filters. When topics, weeks or roles are searched
+for, simulations scoring zero are excluded. Ties keep the original catalog order.
+
+A full-text query (see ``fts.py``) further restricts the results to its
+matches, and its relevance order replaces the catalog order as tie-break.
+"""
+
+import heapq
+import threading
+from collections import defaultdict
+
+from .catalog import get_version
+from .serializers import aserialize_simulations, serialize_simulations
+
+TOPIC_POINTS = 1
+WEEK_POINTS = 2
+ROLE_POINTS = 2
+
+
+class SearchIndex:
+    """Per-facet posting lists mapping a tag to the positions of its simulations."""
+
+    def __init__(self, simulations, version=None):
+        self.version = version
+        self.simulations = list(simulations)
+        self.by_topic = defaultdict(list)
+        self.by_week = defaultdict(list)
+        self.by_role = defaultdict(list)
+        self.by_type = defaultdict(list)
+        self.by_difficulty = defaultdict(list)
+        self.position_by_id = {}
+
+        for pos, sim in enumerate(self.simulations):
+            self.position_by_id[sim["id"]] = pos
+            for topic in set(sim["simulation_topics"]):
+                self.by_topic[topic].append(pos)
+            if sim["week_topic"]:
+                self.by_week[sim["week_topic"]].append(pos)
+            if sim["role"]:
+                self.by_role[sim["role"]].append(pos)
+            self.by_type[sim["type"]].append(pos)
+            self.by_difficulty[sim["difficulty"]].append(pos)
+
+        # Keyed by the filter parameter names of filters.py.
+        self.facets = {
+            "type": self.by_type,
+            "difficulty": self.by_difficulty,
+            "week_topic": self.by_week,
+            "role": self.by_role,
+            "simulation_topics": self.by_topic,
+        }
+        self._bitmaps = None
+
+    def _bitmap(self, positions):
+        bits = bytearray(len(self.simulations) // 8 + 1)
+        for pos in positions:
+            bits[pos >> 3] |= 1 << (pos & 7)
+        return int.from_bytes(bits, "little")
+
+    @property
+    def bitmaps(self):
+        """The posting lists as integer bitsets, built on first use."""
+        if self._bitmaps is None:
+            self._bitmaps = {
+                facet: {
+                    value: self._bitmap(positions) for value, positions in postings.items()
+                }
+                for facet, postings in self.facets.items()
+            }
+        return self._bitmaps
+
+    def facet_counts(self, filters, matches=None):
+        """
+        Count the simulations of every facet value under ``filters``.
+
+        ``filters`` maps facet names to selected values, combined as in
+        ``filters.filter_simulations``: values of a facet are OR-ed, facets are
+        AND-ed. Each facet is counted against the other facets' filters only, so
+        its own unselected values still show how many simulations they would add.
+        ``matches`` restricts every count to the ids of a full-text query.
+        """
+        bitmaps = self.bitmaps
+        everything = (1 << len(self.simulations)) - 1
+        if matches is not None:
+            positions = self.position_by_id
+            everything = self._bitmap(positions[i] for i in matches if i in positions)
+
+        masks = {}
+        for facet, values in filters.items():
+            if values:
+                mask = 0
+                for value in values:
+                    mask |= bitmaps[facet].get(value, 0)
+                masks[facet] = mask
+
+        total = everything
+        for mask in masks.values():
+            total &= mask
+        counts = {}
+        for facet, values in bitmaps.items():
+            base = everything
+            for other, mask in masks.items():
+                if other != facet:
+                    base &= mask
+            counts[facet] = {
+                value: (bitmap & base).bit_count() for value, bitmap in values.items()
+            }
+        return {"total": total.bit_count(), "facets": counts}
+
+    def _allowed(self, postings, values):
+        """Positions passing a hard filter, or None if the filter is not applied."""
+        if values is None:
+            return None
+        allowed = set()
+        for value in values:
+            allowed.update(postings.get(value, ()))
+        return allowed
+
+    def page(self, ids):
+        """The simulations of ``ids``, in order, skipping ids not in the index."""
+        positions = self.position_by_id
+        return [self.simulations[positions[i]] for i in ids if i in positions]
+
+    def search(
+        self,
+        simulation_topics=(),
+        week_topics=(),
+        roles=(),
+        types=None,
+        difficulties=None,
+        limit=None,
+        offset=0,
+        matches=None,
+    ):
+        """
+        Rank the simulations matching the given criteria.
+
+        ``types`` and ``difficulties`` of None mean no filtering on that field.
+        ``matches`` are simulation ids in full-text relevance order, or None.
+        Returns ``(total, page)`` where ``page`` holds the simulation dicts of
+        the requested ``offset``/``limit`` slice of the ranking.
+        """
+        scores = defaultdict(int)
+        for topic in set(simulation_topics):
+            for pos in self.by_topic.get(topic, ()):
+                scores[pos] += TOPIC_POINTS
+        for week in set(week_topics):
+            for pos in self.by_week.get(week, ()):
+                scores[pos] += WEEK_POINTS
+        for role in set(roles):
+            for pos in self.by_role.get(role, ()):
+                scores[pos] += ROLE_POINTS
+
+        if simulation_topics or week_topics or roles:
+            candidates = scores.keys()
+        else:
+            candidates = range(len(self.simulations))
+
+        order = None
+        if matches is not None:
+            order = {}
+            for rank, sim_id in enumerate(matches):
+                pos = self.position_by_id.get(sim_id)
+                if pos is not None:
+                    order[pos] = rank
+            candidates = [pos for pos in candidates if pos in order]
+
+        for allowed in (
+            self._allowed(self.by_type, types),
+            self._allowed(self.by_difficulty, difficulties),
+        ):
+            if allowed is not None:
+                candidates = [pos for pos in candidates if pos in allowed]
+
+        candidates = list(candidates)
+        if order is None:
+            key = lambda pos: (-scores.get(pos, 0), pos)
+        else:
+            key = lambda pos: (-scores.get(pos, 0), order[pos])
+        if limit is None:
+            ranked = sorted(candidates, key=key)[offset:]
+        else:
+            ranked = heapq.nsmallest(offset + limit, candidates, key=key)[offset:]
+
+        return len(candidates), [self.simulations[pos] for pos in ranked]
+
+
+def ranks_by_text(
+    simulation_topics=(), week_topics=(), roles=(), types=None, difficulties=None, **kwargs
+):
+    """
+    Whether ``search`` keyword arguments leave the order to the full-text query.
+
+    With no scoring criteria and no hard filters, a full-text search is a page
+    of its matches, which ``fts.match_page`` slices without ranking them again.
+    """
+    no_scores = not (simulation_topics or week_topics or roles)
+    return no_scores and types is None and difficulties is None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the search index for the current catalog version, rebuilding if stale."""
+    global _index
+    version = get_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = SearchIndex(serialize_simulations(), version)
+            index = _index
+    return index
+
+
+async def aget_index():
+    """Async ``get_index``; a fresh index is returned without leaving the event loop."""
+    global _index
+    version = get_version()
+    index = _index
+    if index is None or index.version != version:
+        index = SearchIndex(await aserialize_simulations(), version)
+        _index = index
+    return index
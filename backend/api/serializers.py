@@ -0,0 +1,252 @@
+from .changes import SIMULATIONS, alatest_change, changes_since, latest_change
+from .models import (
+    RoleTag,
+    Simulation,
+    SimulationRow,
+    SimulationTopic,
+    SimulationTopicType,
+    WeekTopic,
+)
+
+UNCATEGORIZED_TOPIC_TYPE = "ללא סוג"
+UNCATEGORIZED_TOPIC_COLOR = SimulationTopicType._meta.get_field("color").default
+
+
+SIMULATION_FIELDS = (
+    "id",
+    "title",
+    "summary",
+    "author",
+    "url",
+    "week_topic",
+    "type",
+    "difficulty",
+    "role",
+    "simulation_topics",
+)
+
+CATALOG_RESOURCES = ("simulations", "simulation_topics", "role_tags", "week_topics")
+
+
+def simulation_queryset():
+    """
+    Simulations with everything ``serialize_simulation`` needs, ordered by id.
+
+    Only used to build the read model; the API reads ``simulation_rows``.
+    """
+    return (
+        Simulation.objects.all()
+        .select_related(
+            "week_topic",
+            "role",
+        )
+        .prefetch_related(
+            "simulation_topics",
+        )
+        .order_by("id")
+    )
+
+
+def serialize_simulation(sim):
+    return {
+        "id": sim.id,
+        "title": str(sim),
+        "summary": sim.summary,
+        "author": sim.author,
+        "url": sim.url,
+        "week_topic": sim.week_topic.topic,
+        "type": sim.type,
+        "difficulty": sim.difficulty,
+        "role": sim.role.name if sim.role else None,
+        "simulation_topics": [t.name for t in sim.simulation_topics.all()],
+    }
+
+
+def simulation_rows(fields=SIMULATION_FIELDS):
+    """
+    The read model rows as simulation dicts, ordered by id (see readmodel.py).
+
+    Only ``fields`` are selected, so the columns left out are never read.
+    """
+    return SimulationRow.objects.order_by("id").values(*fields)
+
+
+def serialize_simulations(simulations=None):
+    """Build the simulation dicts served by the API, for all simulations by default."""
+    if simulations is None:
+        simulations = simulation_rows()
+    return list(simulations)
+
+
+def iter_simulations(simulations, chunk_size):
+    """
+    Yield lists of simulation dicts, ``chunk_size`` at a time.
+
+    The rows are read with ``.iterator()``, so memory stays bounded by the
+    chunk rather than the catalog.
+    """
+    chunk = []
+    for sim in simulations.iterator(chunk_size=chunk_size):
+        chunk.append(sim)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def aserialize_simulations(simulations=None, chunk_size=2000):
+    """Async ``serialize_simulations``."""
+    if simulations is None:
+        simulations = simulation_rows()
+    return [sim async for sim in simulations.aiterator(chunk_size=chunk_size)]
+
+
+async def aiter_simulations(simulations, chunk_size):
+    """Async ``iter_simulations``."""
+    chunk = []
+    async for sim in simulations.aiterator(chunk_size=chunk_size):
+        chunk.append(sim)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def serialize_simulation_topics():
+    """
+    Build the topic tree: one entry per topic type with its topic names.
+
+    Runs two queries regardless of the number of types. Topics without a type
+    are listed under a trailing uncategorized entry, when there are any.
+    """
+    return _topic_tree(_topic_types(), _topics())
+
+
+async def aserialize_simulation_topics():
+    topic_types = [topic_type async for topic_type in _topic_types()]
+    return _topic_tree(topic_types, [topic async for topic in _topics()])
+
+
+def _topic_types():
+    return SimulationTopicType.objects.all().order_by("serial_num", "name")
+
+
+def _topics():
+    return SimulationTopic.objects.order_by("name").values_list("type_id", "name")
+
+
+def _topic_tree(topic_types, topics):
+    topics_by_type = {}
+    for type_id, name in topics:
+        topics_by_type.setdefault(type_id, []).append(name)
+
+    result = [
+        {
+            "topicType": topic_type.name,
+            "topics": topics_by_type.get(topic_type.id, []),
+            "color": topic_type.color,
+        }
+        for topic_type in topic_types
+    ]
+    if None in topics_by_type:
+        result.append(
+            {
+                "topicType": UNCATEGORIZED_TOPIC_TYPE,
+                "topics": topics_by_type[None],
+                "color": UNCATEGORIZED_TOPIC_COLOR,
+            }
+        )
+    return result
+
+
+def _role_tags():
+    return RoleTag.objects.all().order_by("name").values_list("name", flat=True)
+
+
+def _week_topics():
+    return WeekTopic.objects.all().order_by("serial_num", "topic").values_list(
+        "topic", flat=True
+    )
+
+
+def serialize_role_tags():
+    return list(_role_tags())
+
+
+async def aserialize_role_tags():
+    return [name async for name in _role_tags()]
+
+
+def serialize_week_topics():
+    return list(_week_topics())
+
+
+async def aserialize_week_topics():
+    return [topic async for topic in _week_topics()]
+
+
+def _builders(fields):
+    return {
+        "simulations": lambda: serialize_simulations(simulation_rows(fields)),
+        "simulation_topics": serialize_simulation_topics,
+        "role_tags": serialize_role_tags,
+        "week_topics": serialize_week_topics,
+    }
+
+
+def serialize_all(include=CATALOG_RESOURCES, fields=SIMULATION_FIELDS):
+    """
+    Build the combined catalog from the per-resource structures, without re-encoding.
+
+    ``include`` selects the resources and ``fields`` the simulation fields.
+    ``version`` is the change log version the catalog is at (see changes.py);
+    it is read first, so the data is never older than it.
+    """
+    builders = _builders(fields)
+    return {"version": latest_change()} | {name: builders[name]() for name in include}
+
+
+def serialize_changes(since, include=CATALOG_RESOURCES, fields=SIMULATION_FIELDS):
+    """
+    The changes to the catalog after version ``since``.
+
+    Holds ``version`` and ``since``, the ``upserted`` simulation rows and the
+    ``deleted`` simulation ids, and the whole list of any other included
+    resource that changed. Falls back to ``serialize_all`` (without ``since``)
+    when the change log cannot tell what changed.
+    """
+    changes = changes_since(since)
+    if changes is None:
+        return serialize_all(include, fields)
+    version, simulation_ids, resources = changes
+    builders = _builders(fields)
+    delta = {"version": version, "since": since}
+    for name in include:
+        if name == SIMULATIONS:
+            delta["upserted"] = _rows_by_id(simulation_ids, fields)
+            present = {row["id"] for row in delta["upserted"]}
+            delta["deleted"] = sorted(simulation_ids - present)
+        elif name in resources:
+            delta[name] = builders[name]()
+    return delta
+
+
+def _rows_by_id(ids, fields, batch_size=500):
+    ids = sorted(ids)
+    rows = []
+    for i in range(0, len(ids), batch_size):
+        rows.extend(simulation_rows(fields).filter(id__in=ids[i : i + batch_size]))
+    return rows
+
+
+async def aserialize_all(include=CATALOG_RESOURCES, fields=SIMULATION_FIELDS):
+    builders = {
+        "simulations": lambda: aserialize_simulations(simulation_rows(fields)),
+        "simulation_topics": aserialize_simulation_topics,
+        "role_tags": aserialize_role_tags,
+        "week_topics": aserialize_week_topics,
+    }
+    version = await alatest_change()
+    return {"version": version} | {name: await builders[name]() for name in include}
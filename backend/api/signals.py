@@ -0,0 +1,93 @@
+"""Keep derived, process-level catalog data in sync with the database."""
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+
+from .catalog import bump_version_on_commit
+from .changes import TAG_RESOURCES, record_tags
+from .fts import index_simulation
+from .models import RoleTag, Simulation, SimulationTopic, SimulationTopicType, WeekTopic
+from .readmodel import refresh_on_commit
+
+CATALOG_MODELS = (Simulation, SimulationTopic, SimulationTopicType, RoleTag, WeekTopic)
+SimulationTopics = Simulation.simulation_topics.through
+
+
+def catalog_changed(sender, action=None, **kwargs):
+    """Bump the catalog version once the change is committed."""
+    if action is not None and not action.startswith("post_"):
+        return
+    bump_version_on_commit()
+
+
+def tags_changed(sender, **kwargs):
+    record_tags(sender)
+
+
+def simulation_saving(sender, instance, **kwargs):
+    index_simulation(instance)
+
+
+def simulation_changed(sender, instance, **kwargs):
+    refresh_on_commit([instance.pk])
+
+
+def tag_saved(sender, instance, created, **kwargs):
+    """A renamed tag changes the rows of every simulation carrying it."""
+    if created:
+        return
+    if sender is SimulationTopic:
+        ids = SimulationTopics.objects.filter(simulationtopic=instance).values_list(
+            "simulation_id", flat=True
+        )
+    elif sender is RoleTag:
+        ids = Simulation.objects.filter(role=instance).values_list("id", flat=True)
+    else:
+        ids = Simulation.objects.filter(week_topic=instance).values_list("id", flat=True)
+    refresh_on_commit(ids)
+
+
+def topic_deleting(sender, instance, **kwargs):
+    # The topic's links are deleted along with it, without an m2m_changed signal.
+    refresh_on_commit(
+        SimulationTopics.objects.filter(simulationtopic=instance).values_list(
+            "simulation_id", flat=True
+        )
+    )
+
+
+def topics_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            refresh_on_commit([instance.pk])
+    elif action == "pre_clear":
+        # Remember the simulations losing the topic; refreshed after the clear.
+        instance._cleared_simulation_ids = list(
+            instance.simulations.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_on_commit(instance.__dict__.pop("_cleared_simulation_ids", ()))
+    elif action in ("post_add", "post_remove"):
+        refresh_on_commit(pk_set)
+
+
+pre_save.connect(simulation_saving, sender=Simulation)
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model)
+    post_delete.connect(catalog_changed, sender=model)
+m2m_changed.connect(catalog_changed, sender=SimulationTopics)
+
+post_save.connect(simulation_changed, sender=Simulation)
+post_delete.connect(simulation_changed, sender=Simulation)
+for model in (SimulationTopic, RoleTag, WeekTopic):
+    post_save.connect(tag_saved, sender=model)
+for model in TAG_RESOURCES:
+    post_save.connect(tags_changed, sender=model)
+    post_delete.connect(tags_changed, sender=model)
+pre_delete.connect(topic_deleting, sender=SimulationTopic)
+m2m_changed.connect(topics_changed, sender=SimulationTopics)
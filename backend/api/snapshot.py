@@ -0,0 +1,106 @@
+"""
+Static, content-hashed snapshots of the ``/api/all`` payload.
+
+``build_catalog_snapshot`` writes the payload to ``catalog.<hash>.json`` in
+``CATALOG_SNAPSHOT_DIR``, next to precompressed ``.gz`` (and ``.br``) siblings,
+and then points ``manifest.json`` at it. A snapshot file never changes once
+written, so it can be served by the web server or a CDN with a year-long
+``immutable`` lifetime. Clients only revalidate the few-byte manifest, served by
+``/api/catalog/manifest``.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from .catalog import COMPRESSORS
+from .renderers import dumps
+from .serializers import serialize_all
+
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_PATTERN = "catalog.*.json"
+EXTENSIONS = {"gzip": ".gz", "br": ".br"}
+# Older snapshots are kept for clients that fetched the manifest just before a build.
+KEEP_SNAPSHOTS = 3
+
+
+def snapshot_dir():
+    return Path(settings.CATALOG_SNAPSHOT_DIR)
+
+
+def _write(path, content):
+    """Write ``content`` to ``path`` atomically, so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def build_snapshot(directory=None, keep=KEEP_SNAPSHOTS):
+    """Write a snapshot of the current catalog and its manifest; return the manifest."""
+    directory = Path(directory or snapshot_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    catalog = serialize_all()
+    content = dumps(catalog)
+    digest = hashlib.blake2b(content, digest_size=10).hexdigest()
+    name = f"catalog.{digest}.json"
+
+    _write(directory / name, content)
+    for encoding, compress in COMPRESSORS.items():
+        _write(directory / f"{name}{EXTENSIONS[encoding]}", compress(content))
+    manifest = {
+        "file": name,
+        "hash": digest,
+        # The change log version the catalog was read at (see ``changes.py``),
+        # from which clients can ask for a delta.
+        "version": catalog["version"],
+        "size": len(content),
+        "built_at": int(time.time()),
+    }
+    _write(directory / MANIFEST_NAME, dumps(manifest))
+    _prune(directory, keep)
+    return manifest
+
+
+def _prune(directory, keep):
+    snapshots = sorted(
+        directory.glob(SNAPSHOT_PATTERN), key=lambda path: path.stat().st_mtime, reverse=True
+    )
+    for path in snapshots[keep:]:
+        for variant in [path, *(Path(f"{path}{ext}") for ext in EXTENSIONS.values())]:
+            variant.unlink(missing_ok=True)
+
+
+def read_manifest():
+    """The manifest of the latest snapshot, or None if none was built."""
+    try:
+        return json.loads((snapshot_dir() / MANIFEST_NAME).read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_path(name, encoding=None):
+    """
+    Path of snapshot ``name`` in ``encoding``, or None if there is no such file.
+
+    Falls back to the uncompressed file when the compressed sibling is missing.
+    Returns ``(path, encoding)``.
+    """
+    if not name.startswith("catalog.") or Path(name).name != name:
+        return None, None
+    path = snapshot_dir() / name
+    if encoding is not None:
+        compressed = Path(f"{path}{EXTENSIONS[encoding]}")
+        if compressed.is_file():
+            return compressed, encoding
+    return (path, None) if path.is_file() else (None, None)
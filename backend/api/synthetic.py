@@ -0,0 +1,187 @@
+"""
+Synthetic catalogs of any size, for load testing and benchmarks.
+
+The distributions follow the real knowledge base: a few roles, week topics and
+topics account for most simulations (Zipf-like popularity), simulations carry
+about six topics, most are formal and of medium difficulty, and summaries run
+to a few hundred characters. The number of tags grows with the square root of
+the catalog, as a larger catalog covers more subjects.
+
+Everything is written with bulk inserts, then the read model is rebuilt (see
+``readmodel.py``), which records one change to the whole catalog.
+"""
+
+import functools
+import itertools
+import random
+
+from django.db import connection, transaction
+
+from . import fts
+from .catalog import bump_version
+from .hebrew import index_terms
+from .models import (
+    RoleTag,
+    Simulation,
+    SimulationDifficulty,
+    SimulationRow,
+    SimulationTopic,
+    SimulationTopicType,
+    SimulationType,
+    WeekTopic,
+)
+from .readmodel import rebuild_rows
+
+BATCH_SIZE = 2000
+WEEK_TOPICS = 12
+TYPE_WEIGHTS = {SimulationType.FORMAL: 80, SimulationType.UNANNOUNCED: 20}
+DIFFICULTY_WEIGHTS = {
+    SimulationDifficulty.EASY: 8,
+    SimulationDifficulty.MEDIUM: 60,
+    SimulationDifficulty.HARD: 32,
+}
+UNKNOWN_AUTHOR = Simulation._meta.get_field("author").default
+# Topics per simulation, and summary length in characters: (mean, deviation, max).
+TOPICS_PER_SIMULATION = (6.4, 3.5, 19)
+SUMMARY_LENGTH = (420, 190, 2000)
+NO_ROLE_RATE = 0.05
+KNOWN_AUTHOR_RATE = 0.3
+
+WORDS = (
+    "קצין חייל צוות מפקד פקודה משימה שטח אימון תרגיל שיחה דילמה החלטה אחריות "
+    "מוטיבציה משמעת בטיחות לחץ זמן מידע מודיעין תחקיר שגרה חירום פלוגה מחלקה "
+    "בסיס משפחה חופשה עומס קונפליקט ערכים אמון גבולות מקצועיות רגישות יוזמה "
+    "הנחיה תכנון ביצוע סיכום פידבק ממונה פקוד שיבוץ תורנות ציוד נוהל שמירה"
+).split()
+AVERAGE_WORD_LENGTH = sum(len(word) + 1 for word in WORDS) / len(WORDS)
+
+
+def tag_counts(size):
+    """The number of topic types, topics, roles and week topics for ``size`` simulations."""
+    topics = max(50, round(5 * size**0.5))
+    roles = max(19, round(size**0.5 / 2))
+    return max(4, topics // 100), topics, roles, WEEK_TOPICS
+
+
+def zipf_weights(n, exponent=1.0):
+    """Cumulative weights of ``n`` items whose popularity falls off with their rank."""
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+
+def _length(rng, mean, deviation, maximum, minimum=0):
+    return min(max(round(rng.gauss(mean, deviation)), minimum), maximum)
+
+
+def _words(rng, length):
+    """Random words, about ``length`` characters long when joined."""
+    return rng.choices(WORDS, k=max(1, round(length / AVERAGE_WORD_LENGTH)))
+
+
+@functools.cache
+def _word_terms(word):
+    return index_terms(word).split()
+
+
+def _index_terms(*texts):
+    """``hebrew.index_terms`` of word lists, indexing each distinct word once."""
+    return " ".join(
+        dict.fromkeys(term for words in texts for word in words for term in _word_terms(word))
+    )
+
+
+def clear_catalog():
+    """Delete every simulation and tag with plain SQL, skipping model signals."""
+    with connection.cursor() as cursor:
+        for model in (Simulation.simulation_topics.through, SimulationRow):
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+        fts.delete_all(cursor)
+        for model in (SimulationTopic, SimulationTopicType, RoleTag, WeekTopic):
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+
+
+def _create_tags(size, rng):
+    type_count, topic_count, role_count, week_count = tag_counts(size)
+    topic_types = SimulationTopicType.objects.bulk_create(
+        SimulationTopicType(name=f"סוג נושא {i + 1}", serial_num=i)
+        for i in range(type_count)
+    )
+    topics = SimulationTopic.objects.bulk_create(
+        SimulationTopic(name=f"נושא {i + 1}", type=rng.choice(topic_types))
+        for i in range(topic_count)
+    )
+    roles = RoleTag.objects.bulk_create(
+        RoleTag(name=f"תפקיד {i + 1}") for i in range(role_count)
+    )
+    weeks = WeekTopic.objects.bulk_create(
+        WeekTopic(topic=f"שבוע {i + 1}", serial_num=i) for i in range(week_count)
+    )
+    return topics, roles, weeks
+
+
+def _simulations(size, rng, topics, roles, weeks):
+    """Yield ``(simulation, topic list)`` pairs for ``size`` new simulations."""
+    topic_weights = zipf_weights(len(topics), 0.9)
+    role_weights = zipf_weights(len(roles), 1.1)
+    week_weights = zipf_weights(len(weeks), 0.5)
+    authors = [f"מחבר {i + 1}" for i in range(max(10, len(roles)))]
+    author_weights = zipf_weights(len(authors))
+    types, type_weights = zip(*TYPE_WEIGHTS.items())
+    difficulties, difficulty_weights = zip(*DIFFICULTY_WEIGHTS.items())
+
+    for _ in range(size):
+        count = _length(rng, *TOPICS_PER_SIMULATION)
+        chosen = set(rng.choices(topics, cum_weights=topic_weights, k=count))
+        title = _words(rng, _length(rng, 45, 15, 190, 10))
+        summary = _words(rng, _length(rng, *SUMMARY_LENGTH))
+        author = (
+            rng.choices(authors, cum_weights=author_weights)[0]
+            if rng.random() < KNOWN_AUTHOR_RATE
+            else UNKNOWN_AUTHOR
+        )
+        sim = Simulation(
+            title=" ".join(title),
+            summary=" ".join(summary),
+            author=author,
+            url=f"https://example.com/simulations/{rng.getrandbits(48):012x}",
+            week_topic=rng.choices(weeks, cum_weights=week_weights)[0],
+            type=rng.choices(types, weights=type_weights)[0],
+            difficulty=rng.choices(difficulties, weights=difficulty_weights)[0],
+            role=(
+                None
+                if rng.random() < NO_ROLE_RATE
+                else rng.choices(roles, cum_weights=role_weights)[0]
+            ),
+        )
+        # As fts.index_simulation would.
+        sim.title_terms = _index_terms(title)
+        sim.search_terms = _index_terms(summary, author.split())
+        yield sim, sorted(chosen, key=lambda topic: topic.id)
+
+
+def generate_catalog(size, seed=0, progress=None):
+    """
+    Replace the catalog with ``size`` synthetic simulations.
+
+    ``progress`` is called with the number of simulations written so far after
+    each batch. Returns the number of simulations written.
+    """
+    rng = random.Random(seed)
+    Through = Simulation.simulation_topics.through
+    written = 0
+    with transaction.atomic():
+        clear_catalog()
+        topics, roles, weeks = _create_tags(size, rng)
+        pairs = _simulations(size, rng, topics, roles, weeks)
+        while batch := list(itertools.islice(pairs, BATCH_SIZE)):
+            sims = Simulation.objects.bulk_create(sim for sim, _ in batch)
+            Through.objects.bulk_create(
+                Through(simulation_id=sim.id, simulationtopic_id=topic.id)
+                for sim, (_, sim_topics) in zip(sims, batch)
+                for topic in sim_topics
+            )
+            written += len(sims)
+            if progress is not None:
+                progress(written)
+        rebuild_rows()
+        transaction.on_commit(bump_version)
+    return written
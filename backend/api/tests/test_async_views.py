@@ -0,0 +1,85 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import include, path
+
+from api import async_views, catalog
+from api.models import Simulation
+from api.urls import urlpatterns as sync_urlpatterns
+
+# ``api/urls.py`` as it is with ``API_ASYNC_VIEWS`` on, as under ASGI.
+urlpatterns = [
+    path(
+        "api/",
+        include(
+            [
+                path(str(pattern.pattern), getattr(async_views, pattern.callback.__name__))
+                for pattern in sync_urlpatterns
+            ]
+        ),
+    ),
+]
+
+
+def content(response):
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+async def acontent(response):
+    if response.streaming:
+        return b"".join([chunk async for chunk in response.streaming_content])
+    return response.content
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        catalog.bump_version()
+
+    async def assertSameResponses(self, url, params=None, headers=None):
+        # Each view builds its payload itself rather than reusing the other's.
+        catalog._payloads.clear()
+        expected = await sync_to_async(self.client.get)(url, params, headers=headers)
+        expected_content = await sync_to_async(content)(expected)
+        catalog._payloads.clear()
+        with override_settings(ROOT_URLCONF=__name__):
+            response = await self.async_client.get(url, params, headers=headers)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        for header in ("Content-Type", "Content-Encoding", "ETag", "Vary"):
+            self.assertEqual(response.get(header), expected.get(header), header)
+        self.assertEqual(await acontent(response), expected_content)
+        return response
+
+    async def test_views_match_the_sync_views(self):
+        first = await Simulation.objects.order_by("id").afirst()
+        cases = [
+            ("/api/simulations", None),
+            ("/api/simulations", {"type": first.type, "fields": "title"}),
+            ("/api/simulations", {"limit": 20, "cursor": first.id}),
+            ("/api/simulations", {"stream": "ndjson"}),
+            ("/api/simulations", {"stream": "json", "fields": "title"}),
+            ("/api/simulations", {"limit": 0}),
+            (f"/api/simulations/{first.id}", None),
+            ("/api/simulations/0", None),
+            ("/api/simulation_topics", None),
+            ("/api/role_tags", None),
+            ("/api/week_topics", None),
+            ("/api/all", None),
+            ("/api/all", {"format": "compact", "include": "simulations"}),
+            ("/api/search", {"q": "שיחה"}),
+            ("/api/facets", {"q": "שיחה"}),
+        ]
+        for url, params in cases:
+            with self.subTest(url=url, params=params):
+                await self.assertSameResponses(url, params)
+
+    async def test_compressed_and_not_modified(self):
+        headers = {"Accept-Encoding": "gzip"}
+        response = await self.assertSameResponses("/api/all", headers=headers)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        headers["If-None-Match"] = response["ETag"]
+        response = await self.assertSameResponses("/api/all", headers=headers)
+        self.assertEqual(response.status_code, 304)
+
@@ -0,0 +1,165 @@
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from api import catalog
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "catalog": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=CACHES, API_PAYLOAD_CACHE_BYTES=3000)
+class PayloadCacheTests(SimpleTestCase):
+    def setUp(self):
+        catalog._payloads.clear()
+        self.builds = []
+
+    def payload(self, key, size=1000, encoding=None):
+        def build():
+            self.builds.append(key)
+            return "x" * (size - 2)
+
+        return catalog.get_payload(key, build, encoding)
+
+    def test_hit_reuses_payload(self):
+        self.payload("a")
+        self.payload("a")
+
+        self.assertEqual(self.builds, ["a"])
+
+    def test_new_version_drops_older_payloads(self):
+        self.payload("a")
+        self.payload("b")
+        catalog.bump_version()
+        self.payload("a")
+
+        self.assertEqual(list(catalog._payloads), ["a"])
+
+    def test_least_recently_used_payloads_are_dropped_over_budget(self):
+        self.payload("a")
+        self.payload("b")
+        self.payload("c")
+        self.payload("a")
+        self.payload("d")
+
+        self.assertEqual(list(catalog._payloads), ["c", "a", "d"])
+
+    def test_compressed_variants_count_towards_budget(self):
+        self.payload("a")
+        self.payload("b")
+        self.payload("c", size=990, encoding="gzip")
+
+        self.assertEqual(list(catalog._payloads), ["b", "c"])
+
+    def test_payload_over_budget_is_still_served(self):
+        content, _ = self.payload("a", size=5000)
+
+        self.assertEqual(len(content), 5000)
+        self.assertEqual(list(catalog._payloads), ["a"])
+
+
+class VersionTests(TestCase):
+    def test_catalog_request_reads_the_version_once(self):
+        for path in ("/api/all", "/api/all", "/api/search?q=מפקד", "/api/facets?q=מפקד"):
+            with self.subTest(path=path):
+                with mock.patch.object(
+                    catalog, "_read_version", wraps=catalog._read_version
+                ) as read_version:
+                    response = self.client.get(path)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(read_version.call_count, 1)
+
+
+class NegotiationTests(SimpleTestCase):
+    def negotiate(self, accept_encoding):
+        request = RequestFactory().get("/", headers={"Accept-Encoding": accept_encoding})
+        return catalog.negotiate_encoding(request)
+
+    def test_negotiation(self):
+        preferred = "br" if "br" in catalog.COMPRESSORS else "gzip"
+        cases = [
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, deflate, br", preferred),
+            ("br;q=0, gzip;q=0.5", "gzip"),
+            ("gzip;q=0", None),
+            ("*", preferred),
+            ("*;q=0, gzip", "gzip"),
+            ("gzip;q=oops", None),
+        ]
+        for accept_encoding, expected in cases:
+            with self.subTest(accept_encoding=accept_encoding):
+                self.assertEqual(self.negotiate(accept_encoding), expected)
+
+
+class ConditionalTests(TestCase):
+    GZIP = {"Accept-Encoding": "gzip"}
+
+    def setUp(self):
+        catalog.bump_version()
+
+    def get(self, path, **headers):
+        return self.client.get(path, headers=headers)
+
+    def test_compressed_payload_has_its_own_etag(self):
+        plain = self.get("/api/all")
+        compressed = self.get("/api/all", **self.GZIP)
+
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(compressed["ETag"], plain["ETag"][:-1] + '-gzip"')
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+
+    def test_revalidation(self):
+        for headers in ({}, self.GZIP):
+            with self.subTest(headers=headers):
+                tag = self.get("/api/all", **headers)["ETag"]
+
+                response = self.get("/api/all", **headers, **{"If-None-Match": tag})
+
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], tag)
+
+    def test_compressed_etag_needs_the_same_encoding(self):
+        tag = self.get("/api/all", **self.GZIP)["ETag"]
+
+        self.assertEqual(self.get("/api/all", **{"If-None-Match": tag}).status_code, 200)
+
+    def test_uncompressed_response_has_one_etag_for_every_client(self):
+        path = "/api/simulations?limit=2"
+        plain = self.get(path)
+        accepting = self.get(path, **self.GZIP)
+
+        self.assertNotIn("Content-Encoding", accepting)
+        self.assertEqual(accepting["ETag"], plain["ETag"])
+        response = self.get(path, **self.GZIP, **{"If-None-Match": plain["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_follows_the_query(self):
+        self.assertNotEqual(
+            self.get("/api/simulations?limit=2")["ETag"],
+            self.get("/api/simulations?limit=3")["ETag"],
+        )
+
+    def test_change_invalidates_etag(self):
+        response = self.get("/api/all", **self.GZIP)
+        catalog.bump_version()
+
+        response = self.get(
+            "/api/all",
+            **self.GZIP,
+            **{"If-None-Match": response["ETag"], "If-Modified-Since": response["Last-Modified"]},
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        response = self.get("/api/week_topics")
+
+        response = self.get("/api/week_topics", **{"If-Modified-Since": response["Last-Modified"]})
+
+        self.assertEqual(response.status_code, 304)
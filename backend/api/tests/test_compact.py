@@ -0,0 +1,118 @@
+import json
+import shutil
+import subprocess
+import unittest
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from api.catalog import bump_version
+from api.compact import COMPACT_FORMAT, compact_catalog
+
+FRONTEND_DECODER = settings.BASE_DIR.parent / "frontend" / "src" / "utils" / "compactCatalog.js"
+
+# Imports the module from its source, as the frontend package is not an ES module package.
+NODE_SCRIPT = """
+import { readFileSync } from 'node:fs';
+const { decoder, catalogs } = JSON.parse(readFileSync(0, 'utf8'));
+const source = readFileSync(decoder, 'utf8');
+const { decodeCatalog } = await import(
+    'data:text/javascript,' + encodeURIComponent(source)
+);
+console.log(JSON.stringify(catalogs.map(decodeCatalog)));
+"""
+
+# /api/all parameters, each served regularly and compactly.
+PARAMS = [
+    {},
+    {"fields": "title,role,simulation_topics"},
+    {"include": "simulations,week_topics"},
+    {"include": "role_tags"},
+]
+
+
+def decode_catalog(compact):
+    """``decodeCatalog`` of ``frontend/src/utils/compactCatalog.js``."""
+    catalog = dict(compact)
+    del catalog["format"], catalog["types"], catalog["difficulties"]
+    if "simulations" not in compact:
+        return catalog
+    fields = catalog.pop("fields")
+    topics = [name for group in compact["simulation_topics"] for name in group["topics"]]
+    decoders = {
+        "week_topic": lambda i: compact["week_topics"][i],
+        "role": lambda i: None if i is None else compact["role_tags"][i],
+        "type": lambda i: compact["types"][i],
+        "difficulty": lambda i: compact["difficulties"][i],
+        "simulation_topics": lambda indexes: [topics[i] for i in indexes],
+    }
+    catalog["simulations"] = [
+        {
+            field: decoders[field](value) if field in decoders else value
+            for field, value in zip(fields, row)
+        }
+        for row in compact["simulations"]
+    ]
+    return catalog
+
+
+class CompactCatalogTests(SimpleTestCase):
+    def test_topic_missing_from_the_tree_is_filed_as_uncategorized(self):
+        catalog = {
+            "version": 1,
+            "simulations": [
+                {"id": 1, "week_topic": "שבוע 1", "simulation_topics": ["משוב", "חדש"]}
+            ],
+            "simulation_topics": [{"topicType": "כללי", "topics": ["משוב"], "color": "#fff"}],
+            "role_tags": [],
+            "week_topics": ["שבוע 1"],
+        }
+        fields = ["id", "week_topic", "simulation_topics"]
+
+        # A deep copy, as the encoder appends missing names to the catalog lists.
+        compact = compact_catalog(json.loads(json.dumps(catalog)), fields)
+
+        self.assertEqual(compact["simulations"], [[1, 0, [0, 1]]])
+        self.assertEqual(compact["simulation_topics"][-1]["topics"], ["חדש"])
+        self.assertEqual(decode_catalog(compact)["simulations"], catalog["simulations"])
+
+
+class CompactEndpointTests(TestCase):
+    def setUp(self):
+        bump_version()
+
+    def catalogs(self, params):
+        regular = self.client.get("/api/all", params).json()
+        compact = self.client.get("/api/all", {**params, "format": COMPACT_FORMAT}).json()
+        self.assertEqual(compact["format"], COMPACT_FORMAT)
+        return regular, compact
+
+    def assertDecodesTo(self, decoded, regular):
+        # The tag lists are always served compactly, as they are the dictionaries.
+        self.assertEqual({name: decoded[name] for name in regular}, regular)
+
+    def test_decodes_to_the_regular_catalog(self):
+        for params in PARAMS:
+            with self.subTest(params=params):
+                regular, compact = self.catalogs(params)
+
+                self.assertDecodesTo(decode_catalog(compact), regular)
+
+    @unittest.skipUnless(shutil.which("node"), "requires node")
+    def test_frontend_decoder(self):
+        catalogs = [self.catalogs(params) for params in PARAMS]
+        output = subprocess.run(
+            ["node", "--input-type=module", "-e", NODE_SCRIPT],
+            input=json.dumps(
+                {
+                    "decoder": str(FRONTEND_DECODER),
+                    "catalogs": [compact for _, compact in catalogs],
+                }
+            ),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for (regular, _), decoded in zip(catalogs, json.loads(output)):
+            with self.subTest(include=list(regular)):
+                self.assertDecodesTo(decoded, regular)
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api import fts
+from api.models import Simulation, WeekTopic
+
+
+class MatchTests(TestCase):
+    def setUp(self):
+        fts._match_cache.clear()
+        self.query = "מפקד"
+
+    def test_page_is_a_slice_of_all_matches(self):
+        page = fts.match_page(self.query, 5, 3)
+        fts._match_cache.clear()
+        matches = list(fts.match_ids(self.query))
+
+        self.assertGreater(len(matches), 8)
+        self.assertEqual(page, (len(matches), matches[3:8]))
+
+    def test_pages_share_the_cached_matches(self):
+        first = fts.match_page(self.query, 5)
+        with self.assertNumQueries(0):
+            second = fts.match_page(self.query, 5, 5)
+
+        self.assertEqual(first[0], second[0])
+        self.assertEqual(first[1] + second[1], list(fts.match_ids(self.query)[:10]))
+
+    def test_matches_are_cached_per_version(self):
+        matches = fts.match_ids(self.query)
+        with self.assertNumQueries(0):
+            self.assertEqual(fts.match_ids(self.query), matches)
+            self.assertEqual(fts.match_page(self.query, 5), (len(matches), list(matches[:5])))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Simulation.objects.filter(id=matches[0]).delete()
+        self.assertNotIn(matches[0], fts.match_ids(self.query))
+
+    def test_partial_save_updates_the_index(self):
+        sim = Simulation.objects.get(id=fts.match_ids(self.query)[0])
+        sim.title = "תרגיל קשקושון"
+        sim.summary = "תקציר זברבורי"
+        with self.captureOnCommitCallbacks(execute=True):
+            sim.save(update_fields=["title", "summary"])
+
+        self.assertEqual(list(fts.match_ids("קשקושון")), [sim.id])
+        self.assertEqual(list(fts.match_ids("זברבורי")), [sim.id])
+
+    def test_query_without_words(self):
+        self.assertIsNone(fts.match_ids("!!!"))
+        self.assertIsNone(fts.match_page("!!!", 5))
+
+
+class FallbackTests(TestCase):
+    def setUp(self):
+        fts._match_cache.clear()
+        self.addCleanup(fts._match_cache.clear)
+
+    def fallback_ids(self, text):
+        fts._match_cache.clear()
+        with mock.patch.object(fts, "available", return_value=False):
+            return set(fts.match_ids(text))
+
+    def test_matches_titles(self):
+        sim = Simulation.objects.create(
+            title="תרגיל קשקושון",
+            summary="תקציר",
+            url="https://example.com",
+            week_topic=WeekTopic.objects.first(),
+        )
+
+        self.assertEqual(self.fallback_ids("קשקושון"), {sim.id})
+
+    def test_finds_every_full_text_match(self):
+        for text in ("מפקד", "והמפקד", "שיחה עם"):
+            with self.subTest(text=text):
+                fts._match_cache.clear()
+                self.assertLessEqual(set(fts.match_ids(text)), self.fallback_ids(text))
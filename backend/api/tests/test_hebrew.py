@@ -0,0 +1,34 @@
+from django.test import SimpleTestCase
+
+from api import hebrew
+
+TERMS = {"מפקד"}
+
+
+class HighlightTests(SimpleTestCase):
+    def test_marks_matching_words(self):
+        self.assertEqual(
+            hebrew.highlight("שיחה עם המפקד", TERMS, "<mark>", "</mark>"),
+            "שיחה עם <mark>המפקד</mark>",
+        )
+
+    def test_escapes_text_around_marks(self):
+        self.assertEqual(
+            hebrew.highlight("<img src=x onerror=alert(1)> מפקד", TERMS, "<mark>", "</mark>"),
+            "&lt;img src=x onerror=alert(1)&gt; <mark>מפקד</mark>",
+        )
+
+    def test_escapes_quotes_inside_words(self):
+        self.assertEqual(
+            hebrew.highlight('מ"מ & מפקד', TERMS, "<mark>", "</mark>"),
+            "מ&quot;מ &amp; <mark>מפקד</mark>",
+        )
+
+    def test_snippet_escapes_its_window(self):
+        text = "<b>" + " מילה" * 30 + " מפקד <script>"
+        snippet = hebrew.snippet(text, TERMS, "<mark>", "</mark>", "…", 8)
+
+        self.assertTrue(snippet.startswith("…"))
+        self.assertIn("<mark>מפקד</mark>", snippet)
+        self.assertNotIn("<script>", snippet)
+        self.assertNotIn("<b>", snippet)
@@ -0,0 +1,118 @@
+from django.test import TestCase
+
+from api import fts
+from api.importer import import_rows, import_stream, sync_rows
+from api.models import Simulation, SimulationRow
+
+WORKBOOK = [
+    {
+        "title": "שיחת משוב",
+        "summary": "מפקד נותן משוב לחייל",
+        "week_topic": "פיקוד",
+        "type": "פורמלית",
+        "difficulty": "קלה",
+        "role": "מפקד כיתה",
+        "simulation_topics": "משוב, תקשורת",
+    },
+    {
+        "title": "חייל מאחר",
+        "summary": "חייל מגיע באיחור לשמירה",
+        "week_topic": "משמעת",
+        "type": "מתפרצת",
+        "difficulty": "קשה",
+        "role": None,
+        "simulation_topics": "משמעת",
+    },
+    # Same title as the first row, and no key column.
+    {
+        "title": "שיחת משוב",
+        "summary": "משוב לאחר תרגיל",
+        "week_topic": "פיקוד",
+        "type": "פורמלית",
+        "difficulty": "בינונית",
+        "role": "מפקד כיתה",
+        "simulation_topics": "משוב",
+    },
+    {"title": None, "summary": None},
+]
+UNCHANGED = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 3}
+
+
+class SyncTests(TestCase):
+    def snapshot(self):
+        return list(Simulation.objects.order_by("id").values("id", "title", "summary"))
+
+    def test_resync_of_imported_workbook_changes_nothing(self):
+        import_rows(WORKBOOK)
+        before = self.snapshot()
+
+        self.assertEqual(sync_rows(WORKBOOK), UNCHANGED)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_resync_of_streamed_workbook_changes_nothing(self):
+        for _ in import_stream(iter(WORKBOOK), "test", chunk_size=2):
+            pass
+
+        self.assertEqual(sync_rows(WORKBOOK), UNCHANGED)
+
+    def test_resumed_stream_numbers_keys_as_a_full_import(self):
+        import_rows(WORKBOOK)
+        keys = set(Simulation.objects.values_list("import_key", flat=True))
+
+        stream = import_stream(iter(WORKBOOK), "test", chunk_size=1)
+        next(stream)
+        for _ in import_stream(iter(WORKBOOK), "test", chunk_size=1, resume=True):
+            pass
+
+        self.assertEqual(set(Simulation.objects.values_list("import_key", flat=True)), keys)
+
+    def test_stream_numbers_keys_as_a_full_import(self):
+        workbook = WORKBOOK + [dict(WORKBOOK[0], summary=f"משוב {i}") for i in range(4)]
+        import_rows(workbook)
+        keys = set(Simulation.objects.values_list("import_key", flat=True))
+        self.assertEqual(len(keys), len(workbook) - 1)
+
+        for chunk_size in (1, 3, len(workbook)):
+            with self.subTest(chunk_size=chunk_size):
+                for _ in import_stream(iter(workbook), "test", chunk_size=chunk_size):
+                    pass
+                self.assertEqual(
+                    set(Simulation.objects.values_list("import_key", flat=True)), keys
+                )
+
+    def test_sync_updates_duplicate_titles_separately(self):
+        import_rows(WORKBOOK)
+        edited = [dict(row) for row in WORKBOOK]
+        edited[2]["summary"] = "משוב לאחר תרגיל לילה"
+
+        summary = sync_rows(edited)
+
+        self.assertEqual(summary["updated"], 1)
+        self.assertEqual(summary["deleted"], 0)
+        self.assertEqual(
+            sorted(Simulation.objects.values_list("summary", flat=True)),
+            sorted(row["summary"] for row in edited if row["summary"]),
+        )
+
+
+class ReplaceTests(TestCase):
+    def setUp(self):
+        # The catalog version is only bumped on commit, which tests never reach.
+        fts._match_cache.clear()
+
+    def test_import_replaces_catalog_and_search_index(self):
+        import_rows(WORKBOOK)
+        import_rows(WORKBOOK[1:])
+
+        self.assertEqual(Simulation.objects.count(), 2)
+        self.assertEqual(SimulationRow.objects.count(), 2)
+        self.assertEqual(
+            set(fts.match_ids("משוב")),
+            set(Simulation.objects.filter(title="שיחת משוב").values_list("id", flat=True)),
+        )
+
+    def test_search_index_follows_deletes_after_import(self):
+        import_rows(WORKBOOK)
+        Simulation.objects.filter(title="חייל מאחר").delete()
+
+        self.assertEqual(list(fts.match_ids("באיחור")), [])
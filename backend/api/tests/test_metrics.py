@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api import metrics
+
+REQUESTS = "api_requests_total"
+LABELS = 'view="api/all",status="200"'
+
+
+def exited_pid():
+    """The pid of a process that has exited."""
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+class CollectTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(API_METRICS_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        values = metrics._values
+        metrics._values = {REQUESTS: {LABELS: 1}}
+        self.addCleanup(setattr, metrics, "_values", values)
+
+    def write(self, name, count):
+        (self.directory / name).write_text(json.dumps({REQUESTS: {LABELS: count}}))
+
+    def requests(self):
+        return metrics.collect()[REQUESTS][LABELS]
+
+    def test_adds_up_live_processes(self):
+        self.write(f"{os.getppid()}-parent.json", 5)
+
+        self.assertEqual(self.requests(), 6)
+        self.assertEqual(len(list(self.directory.glob("*.json"))), 2)
+
+    def test_archives_exited_processes(self):
+        self.write(f"{exited_pid()}-exited.json", 5)
+        self.write(f"{exited_pid()}.json", 2)
+
+        self.assertEqual(self.requests(), 8)
+        self.assertEqual(self.requests(), 8)
+        names = {path.name for path in self.directory.glob("*.json")}
+        self.assertEqual(names, {metrics.ARCHIVE_FILE, metrics._file_name})
+
+    def test_archives_an_earlier_process_with_this_pid(self):
+        self.write(f"{os.getpid()}-earlier.json", 5)
+
+        self.assertEqual(self.requests(), 6)
+        self.assertFalse((self.directory / f"{os.getpid()}-earlier.json").exists())
+
+
+class EndpointTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(API_METRICS=True, API_METRICS_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        values = metrics._values
+        metrics._values = {}
+        self.addCleanup(setattr, metrics, "_values", values)
+
+    def test_scrape_counts_requests(self):
+        self.client.get("/api/week_topics")
+        self.client.get("/api/week_topics")
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        self.assertIn(
+            'api_requests_total{view="api/week_topics",status="200"} 2',
+            response.content.decode(),
+        )
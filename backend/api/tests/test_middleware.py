@@ -0,0 +1,57 @@
+import tempfile
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from api import metrics, timing
+from api.middleware import TimingMiddleware
+
+
+def view(request):
+    return HttpResponse(b"ok")
+
+
+class TimingMiddlewareTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(API_METRICS_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        values = metrics._values
+        metrics._values = {}
+        self.addCleanup(setattr, metrics, "_values", values)
+
+    @override_settings(API_TIMING=True, API_TIMING_SAMPLE_RATE=1)
+    def test_sampled_request_is_reported(self):
+        with self.assertLogs("api.timing") as logs:
+            response = self.client.get("/api/week_topics")
+
+        self.assertIn("queries;desc=", response["Server-Timing"])
+        self.assertIn("path=/api/week_topics", logs.output[0])
+
+    @override_settings(API_TIMING=True, API_TIMING_SAMPLE_RATE=0, API_METRICS=False)
+    def test_unsampled_request_is_not_reported(self):
+        with self.assertNoLogs("api.timing"):
+            response = self.client.get("/api/week_topics")
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(API_TIMING=False, API_METRICS=False)
+    def test_removed_when_timing_and_metrics_are_off(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            TimingMiddleware(view)
+
+    @override_settings(API_TIMING=False, API_METRICS=True)
+    def test_timing_off_does_not_time_queries(self):
+        with mock.patch.object(timing, "install") as install:
+            middleware = TimingMiddleware(view)
+        install.assert_not_called()
+
+        response = middleware(RequestFactory().get("/api/week_topics"))
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn("api_request_duration_seconds", metrics._values)
+        self.assertNotIn("api_request_queries", metrics._values)
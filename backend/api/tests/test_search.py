@@ -0,0 +1,213 @@
+import json
+import shutil
+import subprocess
+import unittest
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from api import fts
+from api.catalog import bump_version
+from api.filters import FILTER_PARAMS
+from api.models import SimulationDifficulty, SimulationType
+from api.search import SearchIndex
+
+FRONTEND_SCORER = settings.BASE_DIR.parent / "frontend" / "src" / "utils" / "searchAlgorithm.js"
+
+FORMAL, UNANNOUNCED = SimulationType.FORMAL, SimulationType.UNANNOUNCED
+EASY, MEDIUM, HARD = SimulationDifficulty.EASY, SimulationDifficulty.MEDIUM, SimulationDifficulty.HARD
+
+
+def simulation(id, topics, week, role, type, difficulty):
+    return {
+        "id": id,
+        "simulation_topics": topics,
+        "week_topic": week,
+        "role": role,
+        "type": type,
+        "difficulty": difficulty,
+    }
+
+
+# Out of id order, so that the catalog order tie-break is not the id order.
+SIMULATIONS = [
+    simulation(3, ["משוב", "משמעת"], "שבוע 1", None, UNANNOUNCED, MEDIUM),
+    simulation(1, ["תקשורת", "משוב"], "שבוע 1", "מפקד כיתה", FORMAL, MEDIUM),
+    simulation(2, ["תקשורת"], "שבוע 2", "סמל", FORMAL, HARD),
+    simulation(4, [], "שבוע 2", "מפקד כיתה", FORMAL, EASY),
+    simulation(5, ["תקשורת", "משוב", "משמעת"], "שבוע 2", "סמל", FORMAL, MEDIUM),
+    simulation(6, ["משמעת"], "שבוע 1", "מפקד כיתה", UNANNOUNCED, HARD),
+]
+
+# Search tab criteria (see SearchTab.jsx) and the ids searchSimulations returns.
+CASES = [
+    ({}, [3, 1, 2, 4, 5, 6]),
+    ({"simTopics": ["תקשורת"]}, [1, 2, 5]),
+    ({"simTopics": ["תקשורת", "משוב"], "weeks": ["שבוע 1"]}, [1, 3, 5, 6, 2]),
+    ({"roleTags": ["מפקד כיתה"], "difficulty": [MEDIUM, HARD]}, [1, 6]),
+    ({"weeks": ["שבוע 2"], "type": [UNANNOUNCED]}, []),
+    ({"simTopics": ["משמעת"], "roleTags": ["סמל"], "type": [FORMAL]}, [5, 2]),
+]
+
+# Imports the module from its source, as the frontend package is not an ES module package.
+NODE_SCRIPT = """
+import { readFileSync } from 'node:fs';
+const { scorer, simulations, cases } = JSON.parse(readFileSync(0, 'utf8'));
+const source = readFileSync(scorer, 'utf8');
+const { searchSimulations } = await import(
+    'data:text/javascript,' + encodeURIComponent(source)
+);
+const ranked = cases.map((criteria) =>
+    searchSimulations(simulations, criteria).map((sim) => sim.id)
+);
+console.log(JSON.stringify(ranked));
+"""
+
+
+def search_object(criteria):
+    """The full search object of the frontend, every type and difficulty by default."""
+    return {
+        "simTopics": [],
+        "weeks": [],
+        "roleTags": [],
+        "type": list(SimulationType.values),
+        "difficulty": list(SimulationDifficulty.values),
+        **criteria,
+    }
+
+
+class RankingTests(SimpleTestCase):
+    def search(self, criteria, **kwargs):
+        criteria = search_object(criteria)
+        _, page = SearchIndex(SIMULATIONS).search(
+            simulation_topics=criteria["simTopics"],
+            week_topics=criteria["weeks"],
+            roles=criteria["roleTags"],
+            types=criteria["type"],
+            difficulties=criteria["difficulty"],
+            **kwargs,
+        )
+        return [sim["id"] for sim in page]
+
+    def test_ranking(self):
+        for criteria, expected in CASES:
+            with self.subTest(criteria=criteria):
+                self.assertEqual(self.search(criteria), expected)
+
+    def test_page_is_a_slice_of_the_ranking(self):
+        criteria, expected = CASES[2]
+        self.assertEqual(self.search(criteria, limit=2, offset=1), expected[1:3])
+
+    @unittest.skipUnless(shutil.which("node"), "requires node")
+    def test_cases_match_the_frontend_scorer(self):
+        output = subprocess.run(
+            ["node", "--input-type=module", "-e", NODE_SCRIPT],
+            input=json.dumps(
+                {
+                    "scorer": str(FRONTEND_SCORER),
+                    "simulations": SIMULATIONS,
+                    "cases": [search_object(criteria) for criteria, _ in CASES],
+                }
+            ),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(json.loads(output), [expected for _, expected in CASES])
+
+
+def facet_values(sim, facet):
+    value = sim[facet]
+    return value if isinstance(value, list) else [value]
+
+
+def selected(sim, filters, skip=None):
+    """Whether ``sim`` passes every filter but the one of facet ``skip``."""
+    return all(
+        set(facet_values(sim, facet)) & set(values)
+        for facet, values in filters.items()
+        if values and facet != skip
+    )
+
+
+def expected_counts(simulations, filters, matches=None):
+    """Facet counts computed one simulation at a time."""
+    facets = {facet: {} for facet in FILTER_PARAMS}
+    total = 0
+    for sim in simulations:
+        matched = matches is None or sim["id"] in matches
+        for facet, counts in facets.items():
+            for value in facet_values(sim, facet):
+                if value is not None:
+                    counts.setdefault(value, 0)
+                    counts[value] += matched and selected(sim, filters, skip=facet)
+        total += matched and selected(sim, filters)
+    return {"total": total, "facets": facets}
+
+
+FACET_FILTERS = [
+    {},
+    {"role": ["סמל"], "simulation_topics": ["משמעת"]},
+    {"simulation_topics": ["תקשורת", "משוב"], "week_topic": ["שבוע 1"]},
+    {"type": [FORMAL], "difficulty": [MEDIUM, HARD], "role": ["מפקד כיתה"]},
+    {"week_topic": ["שבוע 3"]},
+]
+
+
+class FacetCountTests(SimpleTestCase):
+    def test_counts(self):
+        index = SearchIndex(SIMULATIONS)
+        for filters in FACET_FILTERS:
+            with self.subTest(filters=filters):
+                self.assertEqual(
+                    index.facet_counts(filters), expected_counts(SIMULATIONS, filters)
+                )
+
+    def test_own_selection_does_not_narrow_its_facet(self):
+        counts = SearchIndex(SIMULATIONS).facet_counts(
+            {"role": ["סמל"], "simulation_topics": ["משמעת"]}
+        )
+
+        self.assertEqual(counts["total"], 1)
+        self.assertEqual(counts["facets"]["role"], {"מפקד כיתה": 1, "סמל": 1})
+        self.assertEqual(
+            counts["facets"]["simulation_topics"], {"משמעת": 1, "משוב": 1, "תקשורת": 2}
+        )
+
+    def test_matches_restrict_every_count(self):
+        filters = {"role": ["סמל"]}
+
+        counts = SearchIndex(SIMULATIONS).facet_counts(filters, matches=[1, 2, 7])
+
+        self.assertEqual(counts["total"], 1)
+        self.assertEqual(counts, expected_counts(SIMULATIONS, filters, matches={1, 2}))
+
+
+class FacetEndpointTests(TestCase):
+    def setUp(self):
+        bump_version()
+        self.simulations = self.client.get("/api/simulations").json()
+
+    def test_counts_match_the_listing(self):
+        sim = self.simulations[0]
+        filters = {
+            "difficulty": [sim["difficulty"]],
+            "simulation_topics": sim["simulation_topics"][:2],
+        }
+
+        counts = self.client.get("/api/facets", filters).json()
+
+        self.assertEqual(counts, expected_counts(self.simulations, filters))
+        listed = self.client.get("/api/simulations", filters).json()
+        self.assertEqual(counts["total"], len(listed))
+
+    def test_query_restricts_the_counts(self):
+        query = "שיחה"
+        matches = set(fts.match_ids(query))
+        filters = {"type": [self.simulations[0]["type"]]}
+
+        counts = self.client.get("/api/facets", {**filters, "q": query}).json()
+
+        self.assertTrue(matches)
+        self.assertLess(counts["total"], len(self.simulations))
+        self.assertEqual(counts, expected_counts(self.simulations, filters, matches))
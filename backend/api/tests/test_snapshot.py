@@ -0,0 +1,31 @@
+import json
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from api import snapshot
+from api.changes import latest_change
+from api.models import RoleTag
+
+
+class ManifestTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(CATALOG_SNAPSHOT_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_manifest_carries_the_version_of_the_snapshot(self):
+        manifest = snapshot.build_snapshot()
+        path, _ = snapshot.snapshot_path(manifest["file"])
+
+        self.assertEqual(manifest["version"], latest_change())
+        self.assertEqual(json.loads(path.read_bytes())["version"], manifest["version"])
+
+    def test_manifest_is_stale_once_the_catalog_changes(self):
+        snapshot.build_snapshot()
+        self.assertFalse(self.client.get("/api/catalog/manifest").json()["stale"])
+
+        RoleTag.objects.create(name="תפקיד חדש")
+        self.assertTrue(self.client.get("/api/catalog/manifest").json()["stale"])
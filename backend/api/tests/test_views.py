@@ -0,0 +1,195 @@
+import json
+from unittest import mock
+
+from django.test import TestCase
+
+from api.catalog import bump_version
+from api.models import RoleTag, Simulation, SimulationTopic, WeekTopic
+from api import views
+from api.params import SIMULATIONS_MAX_PAGE_SIZE
+from api.renderers import NDJSON_CONTENT_TYPE
+
+
+def apply_changes(catalog, changes):
+    """``applyChanges`` of ``frontend/src/utils/catalogSync.js``."""
+    if "since" not in changes:
+        return changes
+    changes = dict(changes)
+    del changes["since"]
+    by_id = {sim["id"]: sim for sim in catalog["simulations"]}
+    by_id.update((sim["id"], sim) for sim in changes.pop("upserted"))
+    for sim_id in changes.pop("deleted"):
+        by_id.pop(sim_id, None)
+    simulations = sorted(by_id.values(), key=lambda sim: sim["id"])
+    return {**catalog, **changes, "simulations": simulations}
+
+
+class CatalogSyncTests(TestCase):
+    def setUp(self):
+        # Payloads cached by earlier tests, whose changes were rolled back.
+        bump_version()
+
+    def change_catalog(self):
+        first, second, third = Simulation.objects.order_by("id")[:3]
+        with self.captureOnCommitCallbacks(execute=True):
+            first.title = "כותרת חדשה"
+            first.save()
+            second.delete()
+            role = RoleTag.objects.exclude(simulations=None).first()
+            role.name = "תפקיד ששמו שונה"
+            role.save()
+            WeekTopic.objects.create(topic="שבוע חדש", serial_num=100)
+            added = Simulation.objects.create(
+                title="סימולציה חדשה",
+                url="https://example.com",
+                week_topic=third.week_topic,
+                type=third.type,
+                difficulty=third.difficulty,
+                role=role,
+            )
+            added.simulation_topics.set(SimulationTopic.objects.all()[:2])
+
+    def test_delta_brings_an_old_catalog_up_to_date(self):
+        old = self.client.get("/api/all").json()
+        self.change_catalog()
+
+        delta = self.client.get("/api/all", {"since": old["version"]}).json()
+        new = self.client.get("/api/all").json()
+
+        self.assertEqual(delta["since"], old["version"])
+        self.assertNotEqual(new["version"], old["version"])
+        self.assertEqual(apply_changes(old, delta), new)
+
+    def test_delta_of_the_current_version_is_empty(self):
+        catalog = self.client.get("/api/all").json()
+
+        delta = self.client.get("/api/all", {"since": catalog["version"]}).json()
+
+        self.assertEqual(delta["upserted"], [])
+        self.assertEqual(delta["deleted"], [])
+        self.assertEqual(apply_changes(catalog, delta), catalog)
+
+
+class ListingTests(TestCase):
+    def setUp(self):
+        bump_version()
+        self.simulations = self.client.get("/api/simulations").json()
+
+    def get(self, **params):
+        return self.client.get("/api/simulations", params)
+
+    def test_pages_walk_every_simulation_in_id_order(self):
+        ids = []
+        cursor = 0
+        while cursor is not None:
+            page = self.get(limit=40, cursor=cursor).json()
+            self.assertLessEqual(len(page["results"]), 40)
+            ids += [sim["id"] for sim in page["results"]]
+            cursor = page["next_cursor"]
+
+        self.assertEqual(ids, sorted(sim["id"] for sim in self.simulations))
+
+    def test_last_full_page_has_no_next_cursor(self):
+        ids = sorted(sim["id"] for sim in self.simulations)
+
+        page = self.get(limit=10, cursor=ids[-11]).json()
+
+        self.assertEqual([sim["id"] for sim in page["results"]], ids[-10:])
+        self.assertIsNone(page["next_cursor"])
+
+    def test_filters(self):
+        sim = self.simulations[0]
+        cases = [
+            ({"type": sim["type"]}, lambda s: s["type"] == sim["type"]),
+            (
+                {"difficulty": sim["difficulty"], "week_topic": sim["week_topic"]},
+                lambda s: s["difficulty"] == sim["difficulty"]
+                and s["week_topic"] == sim["week_topic"],
+            ),
+            (
+                {"role": [sim["role"], "אין תפקיד כזה"]},
+                lambda s: s["role"] == sim["role"],
+            ),
+            (
+                {"simulation_topics": sim["simulation_topics"][:2]},
+                lambda s: set(s["simulation_topics"]) & set(sim["simulation_topics"][:2]),
+            ),
+        ]
+        for params, matches in cases:
+            with self.subTest(params=params):
+                expected = [s["id"] for s in self.simulations if matches(s)]
+                filtered = [s["id"] for s in self.get(**params).json()]
+                paged = [s["id"] for s in self.get(**params, limit=1000).json()["results"]]
+
+                self.assertTrue(expected)
+                self.assertEqual(filtered, expected)
+                self.assertEqual(paged, expected)
+
+    def test_fields(self):
+        results = self.get(fields="title,role", limit=5).json()["results"]
+
+        self.assertEqual({tuple(sim) for sim in results}, {("id", "title", "role")})
+
+    def test_bad_parameters(self):
+        cases = [
+            {"limit": 0},
+            {"limit": SIMULATIONS_MAX_PAGE_SIZE + 1},
+            {"limit": "ten"},
+            {"cursor": -1},
+            {"stream": "xml"},
+            {"stream": "ndjson", "limit": 10},
+            {"fields": "title,secret"},
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                response = self.get(**params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+    def test_missing_simulation(self):
+        missing = max(sim["id"] for sim in self.simulations) + 1
+
+        response = self.client.get(f"/api/simulations/{missing}")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("error", response.json())
+
+
+# Small chunks, so that a stream spans several of them.
+@mock.patch.object(views, "STREAM_CHUNK_SIZE", 40)
+class StreamTests(TestCase):
+    def setUp(self):
+        bump_version()
+        self.simulations = self.client.get("/api/simulations").json()
+
+    def stream(self, **params):
+        response = self.client.get("/api/simulations", params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, content = self.stream(stream="ndjson")
+
+        self.assertEqual(response["Content-Type"], NDJSON_CONTENT_TYPE)
+        self.assertTrue(content.endswith(b"\n"))
+        lines = content.decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.simulations)
+
+    def test_json(self):
+        response, content = self.stream(stream="json")
+
+        self.assertEqual(json.loads(content), self.simulations)
+
+    def test_filters_and_fields(self):
+        sim = self.simulations[0]
+        expected = [
+            {"id": s["id"], "title": s["title"]}
+            for s in self.simulations
+            if s["type"] == sim["type"]
+        ]
+
+        _, content = self.stream(stream="ndjson", type=sim["type"], fields="title")
+
+        lines = content.decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
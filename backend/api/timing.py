@@ -0,0 +1,120 @@
+"""
+Per-request timing, collected by ``middleware.TimingMiddleware``.
+
+The timing of the current request lives in a context variable, which follows
+the request into ``sync_to_async`` threads, so queries run by the async ORM are
+counted too. Queries are timed by an execute wrapper installed on every
+database connection once the middleware is enabled; outside a timed request it
+costs one context variable lookup per query.
+
+Other code adds metrics of its own with ``note``, e.g. whether a catalog
+payload came from the cache, and they are reported along with the rest.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_current = ContextVar("api_request_timing", default=None)
+_installed = False
+
+
+class RequestTiming:
+    """The wall time, database time, query count and extra metrics of a request."""
+
+    def __init__(self, time_queries=True):
+        self.start = time.perf_counter()
+        # None when queries are not timed.
+        self.db_time = 0.0 if time_queries else None
+        self.queries = 0 if time_queries else None
+        self.bytes = None
+        # Whether the request is reported in headers and logs, not just metrics.
+        self.sampled = True
+        # (name, seconds or None, description or None)
+        self.metrics = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self):
+        """The ``Server-Timing`` header value of the metrics collected so far."""
+        parts = [
+            f"total;dur={self.elapsed() * 1000:.1f}",
+            f"db;dur={self.db_time * 1000:.1f}",
+            f"queries;desc={self.queries}",
+        ]
+        if self.bytes is not None:
+            parts.append(f"bytes;desc={self.bytes}")
+        for name, duration, desc in self.metrics:
+            part = name
+            if duration is not None:
+                part += f";dur={duration * 1000:.1f}"
+            if desc is not None:
+                part += f";desc={desc}"
+            parts.append(part)
+        return ", ".join(parts)
+
+
+def current():
+    """The timing of the request being handled, or None if it is not timed."""
+    return _current.get()
+
+
+@contextmanager
+def timing_request(timing):
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+
+
+def note(name, duration=None, desc=None):
+    """Add a metric to the timing of the current request, if it is timed."""
+    timing = _current.get()
+    if timing is not None:
+        timing.metrics.append((name, duration, desc))
+
+
+@contextmanager
+def timed(name, desc=None):
+    """Time the enclosed block as metric ``name`` of the current request."""
+    if _current.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        note(name, time.perf_counter() - start, desc)
+
+
+def _record_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None or timing.queries is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db_time += time.perf_counter() - start
+        timing.queries += 1
+
+
+def _wrap_connection(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """Time the queries of every database connection, current and future."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    connection_created.connect(_wrap_connection, weak=False)
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(connection)
@@ -1,17 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from .views import (
-    list_simulations,
-    list_simulation_topics,
-    list_role_tags,
-    list_week_topics,
-    list_all,
-)
+
+if settings.API_ASYNC_VIEWS:
+    from . import async_views as views
+else:
+    from . import views
 
 
 urlpatterns = [
-    path("simulations", list_simulations),
-    path("simulation_topics", list_simulation_topics),
-    path("role_tags", list_role_tags),
-    path("week_topics", list_week_topics),
-    path("all", list_all),
+    path("simulations", views.list_simulations),
+    path("simulations/<int:sim_id>", views.get_simulation),
+    path("simulation_topics", views.list_simulation_topics),
+    path("role_tags", views.list_role_tags),
+    path("week_topics", views.list_week_topics),
+    path("all", views.list_all),
+    path("search", views.search_simulations),
+    path("facets", views.facet_counts),
+    path("catalog/manifest", views.catalog_manifest),
+    path("catalog/<str:name>", views.catalog_snapshot),
 ]
@@ -1,87 +1,248 @@
-from django.http import JsonResponse
-import json
-from .models import Simulation, SimulationTopicType, SimulationTopic, RoleTag, WeekTopic
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.cache import cache_control
 
+from . import fts, metrics, snapshot
+from .compact import COMPACT_FORMAT, serialize_compact
+from .catalog import conditional, negotiate_encoding, payload_response
+from .changes import latest_change
+from .filters import (
+    filter_simulations,
+    filter_values,
+    has_filters,
+    page_data,
+    page_queryset,
+)
+from .params import (
+    fields_param,
+    format_param,
+    include_param,
+    int_param,
+    listing_params,
+    payload_key,
+    search_params,
+)
+from .renderers import CONTENT_TYPE, NDJSON_CONTENT_TYPE, FastJsonResponse, dumps_chunk
+from .search import get_index, ranks_by_text
+from .serializers import (
+    serialize_all,
+    serialize_changes,
+    serialize_role_tags,
+    serialize_simulation_topics,
+    serialize_simulations,
+    serialize_week_topics,
+    iter_simulations,
+    simulation_rows,
+)
 
+STREAM_CHUNK_SIZE = 500
+
+
+SNAPSHOT_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def bad_request(error):
+    return FastJsonResponse({"error": str(error)}, status=400)
+
+
+def not_found(message):
+    return FastJsonResponse({"error": message}, status=404)
+
+
+@conditional
 def list_simulations(request):
-    simulations = (
-        Simulation.objects.all()
-        .select_related(
-            "week_topic",
-            "role",
-        )
-        .prefetch_related(
-            "simulation_topics",
-        )
-    )
+    """
+    List simulations, optionally filtered (see ``filters.py``) and paginated.
 
-    data = []
-    for sim in simulations:
-        data.append(
-            {
-                "id": sim.id,
-                "title": str(sim),
-                "summary": sim.summary,
-                "author": sim.author,
-                "url": sim.url,
-                "week_topic": sim.week_topic.topic,
-                "type": sim.type,
-                "difficulty": sim.difficulty,
-                "role": sim.role.name if sim.role else None,
-                "simulation_topics": [
-                    t.name for t in sim.simulation_topics.all()
-                ],
-            }
-        )
+    Passing ``limit`` or ``cursor`` switches to keyset pagination on ``id``: the
+    response becomes ``{"results": [...], "next_cursor": ...}``, where
+    ``next_cursor`` is passed back as ``cursor`` to get the following page.
 
-    return JsonResponse(data, safe=False)
+    ``stream=ndjson`` or ``stream=json`` streams every matching simulation
+    instead, as newline-delimited JSON or as one incrementally written array.
 
+    ``fields`` (comma-separated) selects the simulation fields to return; the
+    other columns are not read at all. ``id`` is always returned.
+    """
+    try:
+        stream, page = listing_params(request.GET)
+        fields = fields_param(request.GET)
+    except ValueError as e:
+        return bad_request(e)
 
-def list_simulation_topics(request):
-    topic_types = SimulationTopicType.objects.all().order_by("serial_num", "name")
-    result = []
-    for topic_type in topic_types:
-        topics = (
-            SimulationTopic.objects.filter(type=topic_type)
-            .order_by("name")
-            .values_list("name", flat=True)
-        )
-        result.append(
-            {
-                "topicType": topic_type.name,
-                "topics": list(topics),
-                "color": topic_type.color,
-            }
+    if stream is None and page is None and not has_filters(request.GET):
+        return payload_response(
+            request,
+            payload_key("simulations", fields=fields),
+            lambda: serialize_simulations(simulation_rows(fields)),
         )
 
-    return JsonResponse(result, safe=False)
+    simulations = filter_simulations(simulation_rows(fields), request.GET)
+    if stream is not None:
+        return _stream_simulations(simulations, stream)
+    if page is None:
+        return FastJsonResponse(serialize_simulations(simulations))
+
+    limit, cursor = page
+    rows = serialize_simulations(page_queryset(simulations, limit, cursor))
+    return FastJsonResponse(page_data(rows, limit))
+
+
+def _stream_simulations(simulations, stream):
+    chunks = iter_simulations(simulations, STREAM_CHUNK_SIZE)
+    if stream == "ndjson":
+        content = (dumps_chunk(chunk, ndjson=True) for chunk in chunks)
+        return StreamingHttpResponse(content, content_type=NDJSON_CONTENT_TYPE)
+    return StreamingHttpResponse(_json_array(chunks), content_type=CONTENT_TYPE)
+
+
+def _json_array(chunks):
+    yield b"["
+    separator = b""
+    for chunk in chunks:
+        yield separator + dumps_chunk(chunk)
+        separator = b","
+    yield b"]"
+
+
+@conditional
+def get_simulation(request, sim_id):
+    """A single simulation, e.g. to load a summary left out by ``fields``."""
+    try:
+        fields = fields_param(request.GET)
+    except ValueError as e:
+        return bad_request(e)
+
+    simulation = simulation_rows(fields).filter(id=sim_id).first()
+    if simulation is None:
+        return not_found("No such simulation.")
+    return FastJsonResponse(simulation)
+
+
+@conditional
+def list_simulation_topics(request):
+    return payload_response(request, "simulation_topics", serialize_simulation_topics)
 
 
+@conditional
 def list_role_tags(request):
-    names = list(RoleTag.objects.all().order_by("name").values_list("name", flat=True))
-    return JsonResponse(names, safe=False)
+    return payload_response(request, "role_tags", serialize_role_tags)
 
 
+@conditional
 def list_week_topics(request):
-    topics = list(
-        WeekTopic.objects.all()
-        .order_by("serial_num", "topic")
-        .values_list("topic", flat=True)
-    )
-    return JsonResponse(topics, safe=False)
+    return payload_response(request, "week_topics", serialize_week_topics)
 
 
+@conditional
 def list_all(request):
-    simulations_resp = list_simulations(request)
-    simulation_topics_resp = list_simulation_topics(request)
-    role_tags_resp = list_role_tags(request)
-    week_topics_resp = list_week_topics(request)
-
-    data = {
-        "simulations": json.loads(simulations_resp.content),
-        "simulation_topics": json.loads(simulation_topics_resp.content),
-        "role_tags": json.loads(role_tags_resp.content),
-        "week_topics": json.loads(week_topics_resp.content),
-    }
-
-    return JsonResponse(data)
+    """
+    The whole catalog in one response.
+
+    ``include`` (comma-separated) selects the resources to return and ``fields``
+    the simulation fields, as in ``list_simulations``.
+
+    The catalog carries its ``version``. Clients holding it can pass it back as
+    ``since`` to get only what changed after it (see ``serialize_changes``).
+    ``format=compact`` encodes the catalog with tag indexes (see ``compact.py``).
+    """
+    try:
+        include = include_param(request.GET)
+        fields = fields_param(request.GET)
+        since = int_param(request.GET, "since", None)
+        catalog_format = format_param(request.GET)
+    except ValueError as e:
+        return bad_request(e)
+    if since is not None and catalog_format is not None:
+        return bad_request("since does not support format")
+
+    if since is not None:
+        return FastJsonResponse(serialize_changes(since, include, fields))
+
+    build = serialize_compact if catalog_format == COMPACT_FORMAT else serialize_all
+    return payload_response(
+        request,
+        payload_key("all", include=include, fields=fields, format=catalog_format),
+        lambda: build(include, fields),
+    )
+
+
+@conditional
+def search_simulations(request):
+    """
+    Rank simulations by the chip criteria of the search tab (see ``search.py``).
+
+    ``q`` adds a full-text query over title, summary and author; its results
+    carry a ``highlight`` with the matches marked in the title and a summary
+    snippet.
+    """
+    try:
+        text, params = search_params(request.GET)
+    except ValueError as e:
+        return bad_request(e)
+
+    index = get_index()
+    matches = page = None
+    if text and ranks_by_text(**params):
+        page = fts.match_page(text, params["limit"], params["offset"])
+    if page is None:
+        matches = fts.match_ids(text) if text else None
+        total, results = index.search(matches=matches, **params)
+    else:
+        total, ids = page
+        results = index.page(ids)
+    if page is not None or matches is not None:
+        results = fts.highlight_results(text, results)
+    return FastJsonResponse({"count": total, "results": results})
+
+
+@conditional
+def facet_counts(request):
+    """
+    Count the simulations behind every filter chip for the current filters.
+
+    Takes the filters of ``/api/simulations`` and an optional full-text ``q``,
+    and returns ``{"total": ..., "facets": {facet: {value: count}}}``. Counts
+    come from bitsets over the in-memory search index, with no SQL.
+    """
+    text = request.GET.get("q", "").strip()
+    matches = fts.match_ids(text) if text else None
+    counts = get_index().facet_counts(filter_values(request.GET), matches)
+    return FastJsonResponse(counts)
+
+
+@cache_control(no_cache=True)
+def catalog_manifest(request):
+    """
+    Point at the latest catalog snapshot (see ``snapshot.py``).
+
+    ``stale`` is true once the catalog has changed since the snapshot was
+    built; clients should then fall back to ``/api/all``.
+    """
+    manifest = snapshot.read_manifest()
+    if manifest is None:
+        return not_found("No catalog snapshot has been built.")
+    manifest["url"] = f"{settings.CATALOG_SNAPSHOT_URL}{manifest['file']}"
+    manifest["stale"] = manifest["version"] != latest_change()
+    return FastJsonResponse(manifest)
+
+
+def catalog_snapshot(request, name):
+    """Serve a snapshot file, precompressed if the client accepts it, as immutable."""
+    path, encoding = snapshot.snapshot_path(name, negotiate_encoding(request))
+    if path is None:
+        return not_found("No such catalog snapshot.")
+    response = FileResponse(path.open("rb"), content_type=CONTENT_TYPE)
+    if encoding:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ["Accept-Encoding"])
+    patch_cache_control(response, public=True, max_age=SNAPSHOT_MAX_AGE, immutable=True)
+    return response
+
+
+def metrics_view(request):
+    """The request metrics of every worker process, for Prometheus to scrape."""
+    return HttpResponse(
+        metrics.render(metrics.collect()), content_type=metrics.CONTENT_TYPE
+    )
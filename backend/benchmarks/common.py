@@ -0,0 +1,63 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway test database, never ``db.sqlite3``. Run
+them from the ``backend`` directory, e.g. ``python -m benchmarks.serialization``.
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+from api.synthetic import generate_catalog  # noqa: E402
+from config.test_runner import isolated_settings  # noqa: E402
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Create a migrated test database for the duration of the block.
+
+    SQLite test databases live in memory unless a file ``name`` is given. The
+    shared files of the api app are kept in a temporary directory, as in tests.
+    """
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = name
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with tempfile.TemporaryDirectory() as directory, isolated_settings(directory):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def populate(size, seed=0):
+    """Replace the catalog with ``size`` synthetic simulations (see ``api.synthetic``)."""
+    return generate_catalog(size, seed=seed)
+
+
+def measure(func, repeat=3):
+    """Run ``func`` and return ``(best seconds, peak traced bytes)``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
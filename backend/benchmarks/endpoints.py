@@ -0,0 +1,291 @@
+"""
+Latency, query count, peak memory and payload size of the API endpoints over
+synthetic catalogs of growing size.
+
+    python -m benchmarks.endpoints [--sizes 1k,10k,100k] [--repeat 20]
+    python -m benchmarks.endpoints --sizes 1M --compare benchmarks/results/<old>.json
+
+For each size a synthetic catalog (see ``api.synthetic``) is generated once
+into a database file. Each endpoint is then measured in a process of its own,
+so that its first request finds every cache cold and its peak RSS is its own.
+Warm latencies are of the following requests, served from the caches as in
+production. Timing and metrics middleware are off, as they would be measured
+too.
+
+Results are written as JSON under ``benchmarks/results``; ``--compare`` prints
+the change from an earlier result file and flags regressions.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SEARCH_QUERY = "מודיעין"
+# Path templates, filled in by ``endpoint_context``.
+ENDPOINTS = {
+    "simulations": "/api/simulations",
+    "simulations_filtered": "/api/simulations?difficulty={difficulty}&role={role}",
+    "simulations_page": "/api/simulations?limit=50&cursor={cursor}",
+    "simulations_ndjson": "/api/simulations?stream=ndjson",
+    "simulation_detail": "/api/simulations/{id}",
+    "simulation_topics": "/api/simulation_topics",
+    "role_tags": "/api/role_tags",
+    "week_topics": "/api/week_topics",
+    "all": "/api/all",
+    "all_compact": "/api/all?format=compact",
+    "all_since": "/api/all?since={version}",
+    "search": "/api/search?q={q}",
+    "search_next_page": "/api/search?q={q}&offset=20",
+    "facets": "/api/facets?q={q}&difficulty={difficulty}",
+}
+# Relative increase that counts as a regression when comparing results.
+THRESHOLD = 0.2
+COMPARED = ("warm_p50_ms", "cold_ms", "cold_queries", "bytes", "peak_rss_mib")
+
+
+def parse_size(value):
+    """``1000``, ``10k`` or ``1M``."""
+    multiplier = {"k": 1000, "m": 1_000_000}.get(value[-1:].lower(), 1)
+    return int(value.rstrip("kKmM")) * multiplier
+
+
+def isolated_cache(directory):
+    """Keep the catalog version and metrics of the benchmark out of the project's cache."""
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    caches = {**settings.CACHES}
+    # Shared with the worker processes, unlike the in-memory cache of tests.
+    caches["catalog"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(Path(directory) / "catalog"),
+    }
+    return override_settings(CACHES=caches, API_METRICS_DIR=Path(directory) / "metrics")
+
+
+def endpoint_context():
+    from api.changes import latest_change
+    from api.models import RoleTag, SimulationDifficulty, SimulationRow
+
+    ids = list(SimulationRow.objects.order_by("id").values_list("id", flat=True))
+    middle = ids[len(ids) // 2] if ids else 0
+    role = RoleTag.objects.order_by("id").values_list("name", flat=True).first() or ""
+    return {
+        "id": middle,
+        "cursor": middle,
+        "role": quote(role),
+        "difficulty": quote(SimulationDifficulty.HARD),
+        "version": latest_change(),
+        "q": quote(SEARCH_QUERY),
+    }
+
+
+def peak_rss():
+    """Peak resident memory of this process, in MiB."""
+    # ru_maxrss survives exec on Linux, so a worker would report the peak of
+    # the process that generated the catalog; VmHWM starts afresh.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere.
+    return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 1024
+
+
+def measure_endpoint(path, repeat):
+    """Time ``path`` cold and warm with the test client, in this process."""
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client()
+
+    def get():
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path}: {response.status_code}")
+        if response.streaming:
+            return len(b"".join(response.streaming_content))
+        return len(response.content)
+
+    startup_rss = peak_rss()
+    with CaptureQueriesContext(connection) as cold_queries:
+        start = time.perf_counter()
+        size = get()
+        cold = time.perf_counter() - start
+    warm = []
+    with CaptureQueriesContext(connection) as warm_queries:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            get()
+            warm.append(time.perf_counter() - start)
+    warm.sort()
+    return {
+        "path": path,
+        "cold_ms": round(cold * 1000, 2),
+        "warm_p50_ms": round(statistics.median(warm) * 1000, 2),
+        "warm_p95_ms": round(warm[min(len(warm) - 1, int(len(warm) * 0.95))] * 1000, 2),
+        "cold_queries": len(cold_queries),
+        "warm_queries": len(warm_queries) / repeat,
+        "bytes": size,
+        "startup_rss_mib": round(startup_rss, 1),
+        "peak_rss_mib": round(peak_rss(), 1),
+    }
+
+
+def run_worker(database, endpoint, repeat):
+    from . import common  # noqa: F401 (sets up Django)
+
+    from django.db import connection
+
+    connection.settings_dict["NAME"] = database
+    with isolated_cache(Path(database).parent):
+        path = ENDPOINTS[endpoint].format(**endpoint_context())
+        connection.close()
+        print(json.dumps(measure_endpoint(path, repeat)))
+
+
+def run_size(size, seed, repeat, endpoints):
+    """Generate a catalog of ``size`` simulations and measure ``endpoints`` over it."""
+    from .common import test_database
+
+    from django.db import connection
+
+    from api.synthetic import generate_catalog
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(os.path.join(directory, "bench.sqlite3")), isolated_cache(directory):
+            start = time.perf_counter()
+            generate_catalog(size, seed=seed)
+            print(f"{size} simulations, generated in {time.perf_counter() - start:.1f}s")
+            database = connection.settings_dict["NAME"]
+            connection.close()
+            for endpoint in endpoints:
+                output = subprocess.run(
+                    [
+                        sys.executable, "-m", __spec__.name,
+                        "--worker", database,
+                        "--endpoint", endpoint,
+                        "--repeat", str(repeat),
+                    ],
+                    env={**os.environ, "API_TIMING": "0", "API_METRICS": "0"},
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = results[endpoint] = json.loads(output.splitlines()[-1])
+                print(
+                    f"  {endpoint:<22} cold {result['cold_ms']:9.1f} ms"
+                    f"  p50 {result['warm_p50_ms']:8.1f} ms  p95 {result['warm_p95_ms']:8.1f} ms"
+                    f"  queries {result['cold_queries']:3}/{result['warm_queries']:<4g}"
+                    f"  {result['bytes'] / 1024:10.1f} KiB  rss {result['peak_rss_mib']:7.1f} MiB"
+                )
+    return results
+
+
+def metadata(seed, repeat):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "settings": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"),
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+
+def compare(old, new, threshold=THRESHOLD):
+    """Print the change of every measure from ``old`` results to ``new``, flagging regressions."""
+    print(f"Compared with {old['meta'].get('commit')} of {old['meta']['date']}")
+    regressions = 0
+    for size, endpoints in new["results"].items():
+        for endpoint, result in endpoints.items():
+            before = old["results"].get(size, {}).get(endpoint)
+            if before is None:
+                continue
+            changes = []
+            for measure in COMPARED:
+                a, b = before[measure], result[measure]
+                if a == b:
+                    continue
+                worse = b > a * (1 + threshold) if a else b > 0
+                regressions += worse
+                changes.append(f"{measure} {a:g} → {b:g}{' !' if worse else ''}")
+            if changes:
+                print(f"  {size:>8} {endpoint:<22} {', '.join(changes)}")
+    print(f"{regressions} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1k,10k,100k",
+        help="Comma-separated catalog sizes, e.g. 1k,10k,100k,1M.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20, help="Warm requests per endpoint.")
+    parser.add_argument(
+        "--endpoints",
+        help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}.",
+    )
+    parser.add_argument("--output", type=Path, help="Result file; by default one per run.")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare with.")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--endpoint", choices=ENDPOINTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.endpoint, args.repeat)
+        return
+
+    endpoints = args.endpoints.split(",") if args.endpoints else list(ENDPOINTS)
+    if unknown := set(endpoints).difference(ENDPOINTS):
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    report = {"meta": metadata(args.seed, args.repeat), "results": {}}
+    for size in map(parse_size, args.sizes.split(",")):
+        report["results"][str(size)] = run_size(size, args.seed, args.repeat, endpoints)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"endpoints-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
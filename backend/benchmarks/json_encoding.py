@@ -0,0 +1,70 @@
+"""
+Compare JSON encoders on a synthetic in-memory catalog: the stdlib encoder with
+ASCII escaping (the old ``JsonResponse``), the stdlib encoder emitting UTF-8,
+and ``api.renderers.dumps`` (orjson when installed).
+
+    python -m benchmarks.json_encoding [--size 10000]
+"""
+
+import argparse
+import json
+import random
+
+from .common import measure
+
+from api.renderers import dumps, orjson
+
+TOPICS = [
+    "התנהלות עם רמה ממונה",
+    "התנהלות עם פקודים",
+    "פוליטיקה",
+    "ב\"מ",
+    "ת\"ש",
+    "ברה\"ן",
+    "מקצועיות",
+    "אתיקה",
+]
+ROLES = ["חבצלות", "צמרת", "מפקד צוות", "קמ\"ן"]
+WEEKS = ["סד\"ח", "יסודות", "פיקוד", "ניהול"]
+
+
+def synthetic_catalog(size, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": f"סימולציה מספר {i}: שיחה עם פקוד",
+            "summary": "הנבחן נדרש להוביל שיחה מורכבת עם פקוד. " * rng.randint(3, 10),
+            "author": "מחבר לא ידוע",
+            "url": f"https://example.com/simulations/{i}",
+            "week_topic": rng.choice(WEEKS),
+            "type": rng.choice(["פורמלית", "מתפרצת"]),
+            "difficulty": rng.choice(["קלה", "בינונית", "קשה"]),
+            "role": rng.choice(ROLES),
+            "simulation_topics": rng.sample(TOPICS, rng.randint(1, 4)),
+        }
+        for i in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    data = synthetic_catalog(args.size)
+    encoders = {
+        "stdlib ascii": lambda: json.dumps(data).encode(),
+        "stdlib utf-8": lambda: json.dumps(data, ensure_ascii=False).encode(),
+        f"renderer ({'orjson' if orjson else 'stdlib'})": lambda: dumps(data),
+    }
+
+    print(f"JSON encoding, {args.size} simulations")
+    for name, encoder in encoders.items():
+        seconds, _ = measure(encoder, repeat=5)
+        size = len(encoder())
+        print(f"  {name:<18} {seconds * 1000:8.1f} ms  {size / 2**20:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
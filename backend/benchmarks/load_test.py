@@ -0,0 +1,105 @@
+"""
+Closed-loop HTTP load test, for comparing the sync (WSGI) and async (ASGI)
+deployments of the API.
+
+Start both servers against the same database, e.g.
+
+    gunicorn config.wsgi -w 2 --threads 4 -b 127.0.0.1:8001
+    uvicorn config.asgi:application --workers 2 --port 8002
+
+then run
+
+    python -m benchmarks.load_test --target wsgi=http://127.0.0.1:8001 \\
+        --target asgi=http://127.0.0.1:8002 --path /api/all --clients 200
+
+Each client holds its own keep-alive connection and issues requests back to
+back for ``--duration`` seconds. ``--read-delay`` makes clients read responses
+slowly, to model the slow mobile clients async serving is meant for.
+"""
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def run_client(url, path, headers, deadline, read_delay, latencies, errors):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            while response.read(64 * 1024):
+                if read_delay:
+                    time.sleep(read_delay)
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            connection.close()
+            continue
+        if response.status >= 400:
+            errors.append(response.status)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def load(url, path, clients, duration, read_delay, headers):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(url, path, headers, deadline, read_delay, latencies, errors),
+        )
+        for _ in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        help="name=base URL of a running server; repeat to compare servers.",
+    )
+    parser.add_argument("--path", default="/api/all")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--read-delay", type=float, default=0.0)
+    parser.add_argument("--gzip", action="store_true", help="Send Accept-Encoding: gzip.")
+    args = parser.parse_args()
+
+    headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+    print(f"GET {args.path}, {args.clients} clients, {args.duration:.0f}s")
+    for target in args.target:
+        name, _, url = target.partition("=")
+        latencies, errors = load(
+            url, args.path, args.clients, args.duration, args.read_delay, headers
+        )
+        latencies.sort()
+        print(
+            f"  {name:<6} {len(latencies) / args.duration:8.1f} req/s"
+            f"  p50 {percentile(latencies, 0.5) * 1000:7.1f} ms"
+            f"  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms"
+            f"  mean {statistics.fmean(latencies or [0]) * 1000:7.1f} ms"
+            f"  errors {len(errors)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
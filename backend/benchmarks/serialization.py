@@ -0,0 +1,110 @@
+"""
+Compare building the ``/api/all`` payload as ``list_all`` does now with the
+original ``list_all``.
+
+    python -m benchmarks.serialization [--size 10000]
+
+The original view built every resource from ORM instances into its own
+``JsonResponse``, parsed each response back and encoded everything again. It
+is reproduced here as it was, since the views it called no longer exist. The
+current view encodes the read model (see ``api/readmodel.py``) once with
+orjson.
+"""
+
+import argparse
+import json
+
+from .common import measure, populate, test_database
+
+from django.http import JsonResponse
+
+from api.models import RoleTag, Simulation, SimulationTopic, SimulationTopicType, WeekTopic
+from api.renderers import dumps
+from api.serializers import serialize_all
+
+
+def original_simulations():
+    simulations = (
+        Simulation.objects.all()
+        .select_related("week_topic", "role")
+        .prefetch_related("simulation_topics")
+    )
+    data = []
+    for sim in simulations:
+        data.append(
+            {
+                "id": sim.id,
+                "title": str(sim),
+                "summary": sim.summary,
+                "author": sim.author,
+                "url": sim.url,
+                "week_topic": sim.week_topic.topic,
+                "type": sim.type,
+                "difficulty": sim.difficulty,
+                "role": sim.role.name if sim.role else None,
+                "simulation_topics": [t.name for t in sim.simulation_topics.all()],
+            }
+        )
+    return JsonResponse(data, safe=False)
+
+
+def original_simulation_topics():
+    result = []
+    for topic_type in SimulationTopicType.objects.all().order_by("serial_num", "name"):
+        topics = (
+            SimulationTopic.objects.filter(type=topic_type)
+            .order_by("name")
+            .values_list("name", flat=True)
+        )
+        result.append(
+            {"topicType": topic_type.name, "topics": list(topics), "color": topic_type.color}
+        )
+    return JsonResponse(result, safe=False)
+
+
+def original_role_tags():
+    names = list(RoleTag.objects.all().order_by("name").values_list("name", flat=True))
+    return JsonResponse(names, safe=False)
+
+
+def original_week_topics():
+    topics = WeekTopic.objects.all().order_by("serial_num", "topic").values_list("topic", flat=True)
+    return JsonResponse(list(topics), safe=False)
+
+
+def original_all():
+    """The original ``list_all``: each view's response is parsed back and encoded again."""
+    data = {
+        "simulations": json.loads(original_simulations().content),
+        "simulation_topics": json.loads(original_simulation_topics().content),
+        "role_tags": json.loads(original_role_tags().content),
+        "week_topics": json.loads(original_week_topics().content),
+    }
+    return JsonResponse(data).content
+
+
+def current_all():
+    return dumps(serialize_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with test_database():
+        populate(args.size)
+        results = {
+            "original": measure(original_all),
+            "current": measure(current_all),
+        }
+
+    print(f"/api/all payload build, {args.size} simulations")
+    for name, (seconds, peak) in results.items():
+        print(f"  {name:<12} {seconds * 1000:9.1f} ms  {peak / 2**20:8.1f} MiB peak")
+    (old_s, old_peak), (new_s, new_peak) = results.values()
+    print(f"  saved        {(old_s - new_s) * 1000:9.1f} ms  {(old_peak - new_peak) / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measure catalog reads while an import is writing, under the default SQLite
+settings and under ``config.settings_production``.
+
+    python -m benchmarks.sqlite_concurrency [--size 5000] [--rows 20000] [--readers 8]
+
+Each profile runs in its own process against its own database file. Reader
+threads query filtered pages of simulations in a loop while the main thread
+runs a streaming import in chunks.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROFILES = {"default": "config.settings", "production": "config.settings_production"}
+
+
+def synthetic_rows(count):
+    for i in range(count):
+        yield {
+            "title": f"סימולציה מיובאת {i}",
+            "summary": "תקציר " * 20,
+            "week_topic": f"שבוע {i % 12}",
+            "type": "פורמלית" if i % 3 else "מתפרצת",
+            "difficulty": ("קלה", "בינונית", "קשה")[i % 3],
+            "role": f"תפקיד {i % 30}",
+            "simulation_topics": ", ".join(f"נושא {(i * k) % 60}" for k in (1, 7, 13)),
+        }
+
+
+def reader(stop, latencies, errors):
+    from django.db import OperationalError, connection
+
+    from api.filters import page_queryset
+    from api.serializers import serialize_simulations, simulation_rows
+
+    queryset = simulation_rows().filter(type="פורמלית")
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            serialize_simulations(page_queryset(queryset, 50, 0))
+        except OperationalError:
+            errors.append(1)
+        else:
+            latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def run_profile(size, rows, readers, chunk_size):
+    from .common import populate, test_database
+
+    from api.importer import import_stream
+
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(os.path.join(directory, "bench.sqlite3")):
+            populate(size)
+            stop = threading.Event()
+            latencies, errors = [], []
+            threads = [
+                threading.Thread(target=reader, args=(stop, latencies, errors))
+                for _ in range(readers)
+            ]
+            for thread in threads:
+                thread.start()
+            start = time.perf_counter()
+            for _ in import_stream(synthetic_rows(rows), "benchmark", chunk_size):
+                pass
+            import_seconds = time.perf_counter() - start
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    latencies.sort()
+    p = lambda q: latencies[int(len(latencies) * q)] * 1000 if latencies else 0.0
+    print(
+        f"  {os.environ['DJANGO_SETTINGS_MODULE']:<28} import {import_seconds:6.2f}s"
+        f"  reads {len(latencies) / import_seconds:7.1f}/s"
+        f"  p50 {p(0.5):6.1f} ms  p99 {p(0.99):7.1f} ms"
+        f"  locked errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args.size, args.rows, args.readers, args.chunk_size)
+        return
+
+    print(
+        f"{args.readers} readers during a {args.rows}-row import "
+        f"over {args.size} simulations"
+    )
+    for profile, settings_module in PROFILES.items():
+        subprocess.run(
+            [sys.executable, "-m", __spec__.name, *sys.argv[1:], "--profile", profile],
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": settings_module},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.TimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -71,6 +73,27 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Serve the api app with native async views (api/async_views.py). Turned on by
+# config/asgi.py; under WSGI the sync views avoid an async-to-sync hop.
+API_ASYNC_VIEWS = os.environ.get("API_ASYNC_VIEWS", "0") == "1"
+
+# Request timing of the api app (api/middleware.py): a Server-Timing header and
+# an "api.timing" log line for each sampled request, every request in DEBUG.
+# With API_TIMING off queries are not timed, and with API_METRICS off too the
+# middleware is dropped at startup.
+API_TIMING = os.environ.get("API_TIMING", "1") == "1"
+API_TIMING_SAMPLE_RATE = float(
+    os.environ.get("API_TIMING_SAMPLE_RATE", "1" if DEBUG else "0.01")
+)
+API_TIMING_PATH_PREFIX = "/api/"
+
+# Per-view request metrics served by /metrics (api/metrics.py). Every worker
+# process writes its totals to its own file in API_METRICS_DIR, at most every
+# API_METRICS_FLUSH_INTERVAL seconds; files of exited workers are archived.
+API_METRICS = os.environ.get("API_METRICS", "1") == "1"
+API_METRICS_DIR = Path(os.environ.get("API_METRICS_DIR", BASE_DIR / "cache" / "metrics"))
+API_METRICS_FLUSH_INTERVAL = 1.0
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -83,6 +106,41 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Holds the catalog version; shared between worker processes so that a
+    # change made in one of them invalidates the cached payloads in all.
+    "catalog": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache" / "catalog",
+    },
+}
+
+# Memory each worker may spend on encoded catalog payloads (api/catalog.py),
+# counting every compressed variant; least recently used payloads go first.
+API_PAYLOAD_CACHE_BYTES = int(os.environ.get("API_PAYLOAD_CACHE_BYTES", 256 * 2**20))
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.timing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -120,6 +178,15 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Catalog snapshots written by the build_catalog_snapshot command. Set the URL
+# to wherever the web server or CDN serves the directory from; by default the
+# api app serves it itself.
+CATALOG_SNAPSHOT_DIR = BASE_DIR / "snapshots"
+CATALOG_SNAPSHOT_URL = "/api/catalog/"
+
+# Keeps the files shared between processes out of BASE_DIR during test runs.
+TEST_RUNNER = "config.test_runner.TestRunner"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,48 @@
+"""
+Production settings for config project.
+
+Use with ``DJANGO_SETTINGS_MODULE=config.settings_production``. Tunes SQLite for
+many concurrent readers alongside an occasional writer (an admin edit or an
+import): WAL journaling so readers never block behind a writer, persistent
+connections, and pragmas applied to every new connection by
+``api.db.apply_sqlite_pragmas``.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, SECRET_KEY
+
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", SECRET_KEY)
+
+DEBUG = False
+
+# Report the timing of one API request in a hundred.
+API_TIMING_SAMPLE_RATE = float(os.environ.get("API_TIMING_SAMPLE_RATE", "0.01"))
+
+DATABASES["default"].update(
+    {
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Seconds to wait for a lock before raising "database is locked".
+            # This is SQLite's busy timeout, so it is not also set as a pragma.
+            "timeout": 20,
+            # Take the write lock when a transaction starts, rather than failing
+            # to upgrade a read lock mid-transaction while another writer holds it.
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+)
+
+# Applied in order on every new SQLite connection (see api/db.py).
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    # Durable across application crashes; only an OS crash can lose the last
+    # transactions, which an import can simply redo.
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 2**20,
+    # Negative values are in KiB.
+    "cache_size": -64 * 2**10,
+    "temp_store": "MEMORY",
+}
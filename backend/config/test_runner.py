@@ -0,0 +1,53 @@
+"""
+Test runner for config project.
+
+Runs the tests with the state the api app shares between processes kept in
+memory or in a temporary directory, so that a test run neither reads nor
+leaves behind the state of the development server, and without a request
+timing log line per request.
+"""
+
+import logging
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def isolated_settings(directory):
+    """
+    Settings keeping the shared files of the api app under ``directory``.
+
+    The catalog version is kept in memory, and request metrics are off, as a
+    process flushes its totals again on exit, after the settings are restored;
+    tests of them turn them on.
+    """
+    caches = {
+        **settings.CACHES,
+        "catalog": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "catalog",
+        },
+    }
+    return override_settings(
+        CACHES=caches, API_METRICS=False, API_METRICS_DIR=Path(directory) / "metrics"
+    )
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._directory = tempfile.TemporaryDirectory()
+        self._settings = isolated_settings(self._directory.name)
+        self._settings.enable()
+        timing_logger = logging.getLogger("api.timing")
+        self._timing_level = timing_logger.level
+        timing_logger.setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        logging.getLogger("api.timing").setLevel(self._timing_level)
+        self._settings.disable()
+        self._directory.cleanup()
+        super().teardown_test_environment(**kwargs)
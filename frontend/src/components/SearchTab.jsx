@@ -15,9 +15,49 @@ import SimulationList from './SimulationList';
 import SimulationWindow from './SimulationWindow';
 import ErrorBox from './ErrorBox';
 import { searchSimulations } from '../utils/searchAlgorithm';
+import { applyChanges, loadStoredCatalog, storeCatalog } from '../utils/catalogSync';
+import { COMPACT_FORMAT, decodeCatalog } from '../utils/compactCatalog';
 import ChipSearchBar from './ChipSearchBar';
 import ChipSelectWindow from './ChipSelectWindow';
 
+// Summaries are left out of the API fallback; SimulationWindow loads them on demand.
+const LIST_FIELDS = 'id,title,author,url,week_topic,type,difficulty,role,simulation_topics';
+
+async function fetchJson(url, signal) {
+    const response = await fetch(url, { signal });
+    if (!response.ok) {
+        throw new Error(`Request failed with status ${response.status}`);
+    }
+    return await response.json() || {};
+}
+
+// Prefer the immutable catalog snapshot, falling back to the API when none was
+// built or the catalog has changed since.
+async function fetchFullCatalog(signal) {
+    const manifestResponse = await fetch('/api/catalog/manifest', { signal });
+    if (manifestResponse.ok) {
+        const manifest = await manifestResponse.json();
+        if (!manifest.stale) {
+            const response = await fetch(manifest.url, { signal });
+            if (response.ok) {
+                return await response.json();
+            }
+        }
+    }
+    const compact = await fetchJson(`/api/all?format=${COMPACT_FORMAT}&fields=${LIST_FIELDS}`, signal);
+    return decodeCatalog(compact);
+}
+
+// Bring the catalog stored by the previous visit up to date, if there is one.
+async function fetchCatalog(signal) {
+    const stored = loadStoredCatalog();
+    const catalog = stored?.version === undefined
+        ? await fetchFullCatalog(signal)
+        : applyChanges(stored, await fetchJson(`/api/all?since=${stored.version}&fields=${LIST_FIELDS}`, signal));
+    storeCatalog(catalog);
+    return catalog;
+}
+
 function SearchTab() {
     const theme = useTheme();
 
@@ -29,12 +69,7 @@ function SearchTab() {
         const loadAll = async () => {
             setError(null);
             try {
-                const response = await fetch('/api/all', { signal: abortController.signal });
-                if (!response.ok) {
-                    throw new Error(`Request failed with status ${response.status}`);
-                }
-                const json = await response.json() || {};
-                setServerData(json);
+                setServerData(await fetchCatalog(abortController.signal));
             } catch (err) {
                 if (err.name !== 'AbortError') {
                     console.log(err)
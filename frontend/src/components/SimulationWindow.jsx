@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   Dialog,
   DialogTitle,
@@ -28,9 +28,30 @@ import {
 
 function SimulationWindow({ open, onClose, simulation }) {
   const theme = useTheme();
-  
+
+  // The catalog may have been loaded without summaries; fetch this one on demand.
+  const [loadedSummary, setLoadedSummary] = useState(null);
+  useEffect(() => {
+    setLoadedSummary(null);
+    if (!open || !simulation || simulation.summary !== undefined) {
+      return undefined;
+    }
+    const abortController = new AbortController();
+    fetch(`/api/simulations/${simulation.id}?fields=summary`, { signal: abortController.signal })
+      .then((response) => (response.ok ? response.json() : null))
+      .then((data) => setLoadedSummary(data?.summary ?? null))
+      .catch((err) => {
+        if (err.name !== 'AbortError') {
+          console.log(err);
+        }
+      });
+    return () => abortController.abort();
+  }, [open, simulation]);
+
   if (!simulation) return null;
 
+  const summary = simulation.summary ?? loadedSummary;
+
   // Get type color and icon
   const getTypeConfig = (type) => {
     switch (type) {
@@ -138,13 +159,13 @@ function SimulationWindow({ open, onClose, simulation }) {
           <Divider />
 
           {/* Summary Section */}
-          {simulation.summary && (
+          {summary && (
             <Box>
               <Typography variant="subtitle1" gutterBottom sx={{ display: 'flex', alignItems: 'center', gap: 1, fontSize: { xs: '1rem', md: '1.4rem' }, fontWeight: 'bold' }}>
                 תקציר הסימולציה
               </Typography>
               <Typography variant="body1" sx={{ whiteSpace: 'pre-line', fontSize: { xs: '0.95rem', md: '1.05rem' } }}>
-                {simulation.summary}
+                {summary}
               </Typography>
             </Box>
           )}
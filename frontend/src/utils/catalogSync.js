@@ -0,0 +1,56 @@
+/**
+ * Local copy of the catalog, kept up to date with delta syncs.
+ *
+ * The catalog served by /api/all carries a `version`. Passing it back as
+ * `/api/all?since=<version>` returns only the simulations upserted or deleted
+ * since, along with any tag list that changed. When the server can no longer
+ * tell what changed, it returns the whole catalog instead (without `since`).
+ */
+
+const STORAGE_KEY = 'catalog';
+
+/**
+ * Read the stored catalog.
+ *
+ * @returns {Object|null} The catalog saved by `storeCatalog`, or null.
+ */
+export function loadStoredCatalog() {
+    try {
+        const stored = localStorage.getItem(STORAGE_KEY);
+        return stored ? JSON.parse(stored) : null;
+    } catch {
+        return null;
+    }
+}
+
+/**
+ * Save the catalog for the next visit.
+ *
+ * @param {Object} catalog - Catalog as returned by `applyChanges`.
+ */
+export function storeCatalog(catalog) {
+    try {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(catalog));
+    } catch {
+        // Storage full or unavailable: the next visit loads the catalog from scratch.
+    }
+}
+
+/**
+ * Apply a `/api/all?since=` response to a catalog.
+ *
+ * @param {Object} catalog - Catalog at version `changes.since`.
+ * @param {Object} changes - Response of `/api/all?since=`.
+ * @returns {Object} The catalog at version `changes.version`.
+ */
+export function applyChanges(catalog, changes) {
+    if (changes.since === undefined) {
+        return changes; // A full catalog.
+    }
+    const { since, upserted, deleted, ...rest } = changes;
+    const byId = new Map(catalog.simulations.map((sim) => [sim.id, sim]));
+    upserted.forEach((sim) => byId.set(sim.id, sim));
+    deleted.forEach((id) => byId.delete(id));
+    const simulations = [...byId.values()].sort((a, b) => a.id - b.id);
+    return { ...catalog, ...rest, simulations };
+}
@@ -0,0 +1,56 @@
+/**
+ * Decoder of the compact catalog served by `/api/all?format=compact`.
+ *
+ * In the compact form each simulation is an array of the values of `fields`,
+ * and its tags are indexes into the catalog lists instead of names:
+ *
+ * ┌────────────────────┬──────────────────────────────────────────────────┐
+ * │ Field              │ Index into                                       │
+ * ├────────────────────┼──────────────────────────────────────────────────┤
+ * │ week_topic         │ week_topics                                      │
+ * │ role               │ role_tags (or null)                              │
+ * │ simulation_topics  │ the topics of simulation_topics, across types    │
+ * │ type, difficulty   │ types, difficulties                              │
+ * └────────────────────┴──────────────────────────────────────────────────┘
+ *
+ * See backend/api/compact.py.
+ */
+
+export const COMPACT_FORMAT = 'compact';
+
+/**
+ * Decode a compact catalog into the regular `/api/all` structure.
+ *
+ * Tag names are shared between simulations rather than copied, so the decoded
+ * catalog also takes less memory than a parsed regular one.
+ *
+ * @param {Object} compact - Response of `/api/all?format=compact`.
+ * @returns {Object} The catalog, as returned by `/api/all`.
+ */
+export function decodeCatalog(compact) {
+    const { format, fields, simulations, types, difficulties, ...catalog } = compact;
+    if (format !== COMPACT_FORMAT) {
+        return compact;
+    }
+    if (!simulations) {
+        return catalog;
+    }
+
+    const topics = compact.simulation_topics.flatMap((group) => group.topics);
+    const decoders = {
+        week_topic: (i) => compact.week_topics[i],
+        role: (i) => (i === null ? null : compact.role_tags[i]),
+        type: (i) => types[i],
+        difficulty: (i) => difficulties[i],
+        simulation_topics: (indexes) => indexes.map((i) => topics[i]),
+    };
+    const decodeField = fields.map((field) => decoders[field] ?? ((value) => value));
+    catalog.simulations = simulations.map((row) => {
+        const sim = {};
+        fields.forEach((field, i) => {
+            sim[field] = decodeField[i](row[i]);
+        });
+        return sim;
+    });
+    return catalog;
+}